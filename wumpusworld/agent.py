@@ -1,11 +1,12 @@
 from collections import deque
-from copy import deepcopy
 from enum import Enum
 from world import WumpusWorld as World
 from world import Direction
+from world import Percept
 from sat_solver import KnowledgeBase
+import tracing
 import math
-from queue import PriorityQueue
+import heapq
 
 class Status(Enum):
     UNSAFE = 1
@@ -14,75 +15,132 @@ class Status(Enum):
 
 
 class Room:
+    """A room in the memory of the agent. The percept is immutable, so it is shared by the path records of the room.
+    Once the room is stored in a Map, the map is told about every change of its status."""
+    __slots__ = ('pos', 'wpos', 'percept', '__status', 'memory', 'symbols')
+
     def __init__(self, pos: tuple, wpos: tuple, percept, status: Status):
         self.pos = pos
         self.wpos = wpos
         self.percept = percept
-        self.status = status
+        self.memory = None
+        self.symbols = None # integers of the pit and wumpus symbols of the room in the knowledge base
+        self.__status = status
+
+    @property
+    def status(self):
+        return self.__status
+
+    @status.setter
+    def status(self, status: Status):
+        old, self.__status = self.__status, status
+        if self.memory is not None and old != status:
+            self.memory.update_status(self, old)
 
 
 class Map:
+    """The memory of the agent, positions are relative to the starting room.
+
+    The agent can be anywhere in a world of size n, so every relative position fits in a (2n - 1) x (2n - 1) grid
+    centered on the starting room. The grid is allocated once as a flat list, and the bounds of the allocated rooms are
+    only tracked for data() and __str__.
+
+    The cells of the SAFE rooms are kept in a set that follows the status of the rooms, so is_explored does not scan
+    the grid.
+
+    Once the exit room (1, 1) has been found, the map also keeps a shortest path tree rooted at it over the EXPLORED
+    rooms, so exit_path answers in the length of the path. A room that becomes EXPLORED joins the tree and shortens
+    the paths that can go through it. A room leaving EXPLORED, which only happens when the agent shoots into it, can
+    cut the tree, so the tree is then rebuilt on the next query.
+    """
+
     def __init__(self, world: World, start: Room):
         self.__world = world
-        self.__data: list[list] = [[start]]
-        self.__offset = (0, 0)
+        self.__size = 2 * world.n - 1
+        self.__offset = world.n - 1
+        self.__data: list = [None] * (self.__size * self.__size)
+        self.__bounds = [0, 0, 0, 0] # top, bottom, left, right rows and columns of the allocated rooms
+        self.__frontier = set() # cells of the SAFE rooms
+        self.__exit = None # cell of the exit room
+        self.__exit_distances = {} # cell -> distance to the exit, for the EXPLORED rooms in the exit tree
+        self.__exit_parents = {} # cell -> next cell towards the exit, None for the exit
+        self.__exit_stale = False # a room left the tree since it was built
+        self[start.pos] = start
 
     def data(self):
-        return self.__data
-
-    def __getallocstate(self, position):
-        d = (position[0] + self.__offset[0], position[1] + self.__offset[1])
-        if d[0] >= len(self.__data) or d[1] >= len(self.__data[0]) or d[0] < 0 or d[1] < 0:
-            return 0
-        if self[position] is None:
-            return 1
-        return 2
+        top, bottom, left, right = self.__bounds
+        return [self.__data[(row + self.__offset) * self.__size + left + self.__offset:
+                            (row + self.__offset) * self.__size + right + self.__offset + 1]
+                for row in range(top, bottom + 1)]
+
+    def __index(self, position):
+        """Index of a position in the flat grid, or -1 if it is outside the grid."""
+        row, col = position[0] + self.__offset, position[1] + self.__offset
+        if row < 0 or col < 0 or row >= self.__size or col >= self.__size:
+            return -1
+        return row * self.__size + col
+
+    def cell(self, position):
+        """Integer id of a position, ids are ordered like the positions they stand for."""
+        return (position[0] + self.__offset) * self.__size + position[1] + self.__offset
+
+    def room(self, cell):
+        """Room of a cell id, None if it is not allocated."""
+        return self.__data[cell]
+
+    def adjacent_cells(self, cell):
+        """Ids of the allocated rooms adjacent to a cell, in increasing order."""
+        size, data = self.__size, self.__data
+        col = cell % size
+        cells = []
+        if cell >= size and data[cell - size] is not None:
+            cells.append(cell - size)
+        if col > 0 and data[cell - 1] is not None:
+            cells.append(cell - 1)
+        if col < size - 1 and data[cell + 1] is not None:
+            cells.append(cell + 1)
+        if cell + size < len(data) and data[cell + size] is not None:
+            cells.append(cell + size)
+        return cells
 
     def _getworldposition_(self, item):
-        d = (item[0] + self.__offset[0], item[1] + self.__offset[1])
+        d = (item[0] + self.__offset, item[1] + self.__offset)
         return d
 
     def __getitem__(self, item):
-        d = (item[0] + self.__offset[0], item[1] + self.__offset[1])
-        return self.__data[d[0]][d[1]]
+        return self.__data[(item[0] + self.__offset) * self.__size + item[1] + self.__offset]
 
     def __setitem__(self, key, value):
-        d = (key[0] + self.__offset[0], key[1] + self.__offset[1])
-        self.__data[d[0]][d[1]] = value
+        cell = (key[0] + self.__offset) * self.__size + key[1] + self.__offset
+        if self.__data[cell] is not None:
+            self.__data[cell].memory = None
+        if cell in self.__exit_distances:
+            self.__exit_stale = True
+        self.__frontier.discard(cell)
+        self.__data[cell] = value
+        if value is not None:
+            value.memory = self
+            if value.wpos == (1, 1):
+                self.__exit = cell
+            if value.status == Status.SAFE:
+                self.__frontier.add(cell)
+            elif value.status == Status.EXPLORED:
+                self.__grow(cell)
+        bounds = self.__bounds
+        bounds[0], bounds[1] = min(bounds[0], key[0]), max(bounds[1], key[0])
+        bounds[2], bounds[3] = min(bounds[2], key[1]), max(bounds[3], key[1])
 
     def add(self, parent, direction, cwpos):
         if direction == Direction.RIGHT:
             cpos = (parent[0], parent[1] + 1)
-            if self.__getallocstate(cpos) == 0:
-                for row in self.__data:
-                    row.append(None)
-                self[cpos] = Room(cpos, cwpos, None, Status.SAFE)
-            elif self.__getallocstate(cpos) == 1:
-                self[cpos] = Room(cpos, cwpos, None, Status.SAFE)
         elif direction == Direction.DOWN:
             cpos = (parent[0] + 1, parent[1])
-            if self.__getallocstate(cpos) == 0:
-                self.__data.append([None for _ in range(len(self.__data[0]))])
-                self[cpos] = Room(cpos, cwpos, None, Status.SAFE)
-            elif self.__getallocstate(cpos) == 1:
-                self[cpos] = Room(cpos, cwpos, None, Status.SAFE)
         elif direction == Direction.LEFT:
             cpos = (parent[0], parent[1] - 1)
-            if self.__getallocstate(cpos) == 0:
-                for row in self.__data:
-                    row.insert(0, None)
-                self.__offset = (self.__offset[0], self.__offset[1] + 1)
-                self[cpos] = Room(cpos, cwpos, None, Status.SAFE)
-            elif self.__getallocstate(cpos) == 1:
-                self[cpos] = Room(cpos, cwpos, None, Status.SAFE)
-        elif direction == Direction.UP:
+        else:
             cpos = (parent[0] - 1, parent[1])
-            if self.__getallocstate(cpos) == 0:
-                self.__data.insert(0, [None for _ in range(len(self.__data[0]))])
-                self.__offset = (self.__offset[0] + 1, self.__offset[1])
-                self[cpos] = Room(cpos, cwpos, None, Status.SAFE)
-            elif self.__getallocstate(cpos) == 1:
-                self[cpos] = Room(cpos, cwpos, None, Status.SAFE)
+        if self[cpos] is None:
+            self[cpos] = Room(cpos, cwpos, None, Status.SAFE)
 
     def get_nearby(self, position):
         nearby = []
@@ -90,27 +148,98 @@ class Map:
         left = (position[0], position[1] - 1)
         up = (position[0] - 1, position[1])
         down = (position[0] + 1, position[1])
-        if self.__getallocstate(right) == 2:
-            nearby.append(self[right])
-        if self.__getallocstate(down) == 2:
-            nearby.append(self[down])
-        if self.__getallocstate(left) == 2:
-            nearby.append(self[left])
-        if self.__getallocstate(up) == 2:
-            nearby.append(self[up])
+        for neighbor in (right, down, left, up):
+            index = self.__index(neighbor)
+            if index >= 0 and self.__data[index] is not None:
+                nearby.append(self.__data[index])
         return nearby
 
     def explore(self, position):
         self[position].status = Status.EXPLORED
 
     def is_explored(self):
-        return not any(room is not None and room.status == Status.SAFE for row in self.__data for room in row)
+        return not self.__frontier
+
+    def update_status(self, room: Room, old: Status):
+        """Follow a change of the status of a room, called by the room."""
+        cell = self.cell(room.pos)
+        if room.status == Status.SAFE:
+            self.__frontier.add(cell)
+        elif old == Status.SAFE:
+            self.__frontier.discard(cell)
+        if room.status == Status.EXPLORED:
+            self.__grow(cell)
+        elif cell in self.__exit_distances:
+            self.__exit_stale = True
+
+    def __grow(self, cell):
+        """Add an EXPLORED room to the exit tree if it is the exit or next to the tree, and pass the shorter paths
+        through it on to the EXPLORED rooms around it."""
+        data, distances, parents = self.__data, self.__exit_distances, self.__exit_parents
+        if self.__exit_stale:
+            return
+        if cell == self.__exit:
+            distances[cell], parents[cell] = 0, None
+        else:
+            nearest = min(((distances[neighbor], neighbor) for neighbor in self.adjacent_cells(cell)
+                           if neighbor in distances), default=None)
+            if nearest is None or cell in distances and distances[cell] <= nearest[0] + 1:
+                return
+            distances[cell], parents[cell] = nearest[0] + 1, nearest[1]
+        # the paths through the room grow one step per layer, so every room is improved at most once
+        queue = deque([cell])
+        while queue:
+            current = queue.popleft()
+            distance = distances[current] + 1
+            for neighbor in self.adjacent_cells(current):
+                if data[neighbor].status == Status.EXPLORED and distances.get(neighbor, distance + 1) > distance:
+                    distances[neighbor], parents[neighbor] = distance, current
+                    queue.append(neighbor)
+
+    def __rebuild(self):
+        """Build the exit tree again from the exit."""
+        self.__exit_distances.clear()
+        self.__exit_parents.clear()
+        self.__exit_stale = False
+        if self.__exit is not None and self.__data[self.__exit].status == Status.EXPLORED:
+            self.__grow(self.__exit)
+
+    def exit_distance(self, cell):
+        """Find the length of the shortest way from a room to the exit through EXPLORED rooms, the room itself does
+        not have to be EXPLORED.
+        :param cell: cell of the room
+        :returns: the number of steps, or None if the exit is unknown or cannot be reached
+        """
+        path = self.exit_path(cell)
+        return None if path is None else len(path) - 1
+
+    def exit_path(self, cell):
+        """Find a shortest way from a room to the exit through EXPLORED rooms, the room itself does not have to be
+        EXPLORED.
+        :param cell: cell of the room
+        :returns: the cells of the way, from the room to the exit, or None if the exit is unknown or cannot be reached
+        """
+        if self.__exit_stale:
+            self.__rebuild()
+        distances, parents = self.__exit_distances, self.__exit_parents
+        if cell == self.__exit:
+            return [cell]
+        path = [cell]
+        if cell not in distances:
+            nearest = min(((distances[neighbor], neighbor) for neighbor in self.adjacent_cells(cell)
+                           if neighbor in distances), default=None)
+            if nearest is None:
+                return None
+            path.append(nearest[1])
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        return path
 
     def position(self, actual_position):
         return actual_position[0] - self.__world.agent[0], actual_position[1] - self.__world.agent[1]
 
     def __str__(self):
-        return '\n'.join(['[' + ','.join([str(room) if room is not None else '(None, None, None)' for room in row]) + ']' for row in self.__data])
+        return '\n'.join(['[' + ','.join([str(room) if room is not None else '(None, None, None)' for room in row]) + ']' for row in self.data()])
 
 
 class Action(Enum):
@@ -130,9 +259,9 @@ class Action(Enum):
 class Agent:
     def __init__(self, world: World):
         self.world = world
-        self.current = Room((0, 0), world.agent, 'A', Status.SAFE)
+        self.current = Room((0, 0), world.agent, 0, Status.SAFE)
         self.visited = set()
-        self.kb = KnowledgeBase(True, [])
+        self.kb = KnowledgeBase(True, [], mode='cdcl', heuristic='vsids')
         self.golds = []
 
     def __is_wall(self, position: tuple):
@@ -143,46 +272,39 @@ class Agent:
 
     @classmethod
     def infer(cls, kb, clause):
-        """Infer the knowledge base."""
-        temp = deepcopy(kb)
-        temp.add_clause([clause])
-        result = temp.solve()
-        return not result
+        """Infer the knowledge base, propagation answers first and the solver only searches when it is inconclusive."""
+        return kb.infer(clause)
+
+    @classmethod
+    def symbols(cls, kb, room):
+        """Get the integers of the pit and wumpus symbols of a room, the names are only formatted once per room."""
+        if room.symbols is None:
+            room.symbols = (kb.symbols.intern(f'P{room.pos}'), kb.symbols.intern(f'W{room.pos}'))
+        return room.symbols
 
     @classmethod
     def update(cls, kb, room, adjacents):
         """Update the knowledge base."""
-        if 'P' in room.percept:
-            pit_clause = {f'P{room.pos}': 0}
-        else:
-            pit_clause = {f'P{room.pos}': 1}
-        kb.add_clause([pit_clause])
-
-        if 'W' in room.percept:
-            wumpus_clause = {f'W{room.pos}': 0}
-        else:
-            wumpus_clause = {f'W{room.pos}': 1}
-        kb.add_clause([wumpus_clause])
+        pit, wumpus = cls.symbols(kb, room)
+        kb.add_literals([(pit,) if room.percept & Percept.PIT else (-pit,)])
+        kb.add_literals([(wumpus,) if room.percept & Percept.WUMPUS else (-wumpus,)])
 
-        if 'B' in room.percept:
+        if room.percept & Percept.BREEZE:
             # Breeze => Pup or Pdown or Pleft or Pright
             # not Breeze or Pup or Pdown or Pleft or Pright
-            breeze_clause = {f'B{room.pos}': 1}
-            for adjacent in adjacents:
-                breeze_clause.update({f'P{adjacent.pos}': 0})
-            kb.add_clause([breeze_clause])
+            breeze = kb.symbols.intern(f'B{room.pos}')
+            kb.add_literals([[-breeze] + [cls.symbols(kb, adjacent)[0] for adjacent in adjacents]])
 
-        if 'S' in room.percept:
+        if room.percept & Percept.STENCH:
             # Stench => Wup or Wdown or Wleft or Wright
-            stench_clause = {f'S{room.pos}': 1}
-            for adjacent in adjacents:
-                stench_clause.update({f'P{adjacent.pos}': 0})
-            kb.add_clause([stench_clause])
+            stench = kb.symbols.intern(f'S{room.pos}')
+            kb.add_literals([[-stench] + [cls.symbols(kb, adjacent)[0] for adjacent in adjacents]])
 
-        if room.percept == '' or room.percept == 'E' or room.percept == 'K':
+        if room.percept == 0 or room.percept == Percept.EMPTY or room.percept == Percept.KILLED:
             for adjacent in adjacents:
                 # not Padj and not Wadj
-                kb.add_clause([{f'P{adjacent.pos}': 1}, {f'W{adjacent.pos}': 1}])
+                pit, wumpus = cls.symbols(kb, adjacent)
+                kb.add_literals([(-pit,), (-wumpus,)])
                 kb.del_clause(f'S{room.pos}')
                 kb.del_clause(f'B{room.pos}')
 
@@ -191,6 +313,28 @@ class Agent:
         """Remove wumpus from the knowledge base."""
         kb.del_clause(symbol)
 
+    @classmethod
+    def __explore(cls, task):
+        """Run a step of the exploration to its end without recursion.
+        __search, __shoot and __shoot_until_scream are generators: instead of calling each other they yield the
+        generator of the step they would call and receive its result, so the steps waiting for a result are kept on an
+        explicit stack rather than on the call stack, and the depth of the exploration is only bounded by memory.
+        :param task: the generator of the first step
+        :returns: the result of the first step
+        """
+        stack = [task]
+        result = None
+        while stack:
+            try:
+                step = stack[-1].send(result)
+            except StopIteration as stop:
+                stack.pop()
+                result = stop.value
+            else:
+                stack.append(step)
+                result = None
+        return result
+
     @classmethod
     def __shoot(cls, room, path: deque, mem: Map, inventory: set, world: World,
                 kb: KnowledgeBase, shoot):
@@ -204,7 +348,7 @@ class Agent:
         target.status = Status.EXPLORED
         if scream:
             cls.remove_wumpus(kb, f'W{target.pos}')
-            if 'S' not in room.percept:
+            if not room.percept & Percept.STENCH:
                 for adjacent in adjacents:
                     if adjacent.status == Status.UNSAFE:
                         adjacent.status = Status.SAFE
@@ -214,7 +358,7 @@ class Agent:
                 if not all(room for room in mem.get_nearby(adjacent.pos) if room.status == Status.EXPLORED):
                     adjacent.status = Status.SAFE
         target.status = Status.SAFE
-        if cls.__search(target, room, path, mem, inventory, world, kb, shoot):
+        if (yield cls.__search(target, room, path, mem, inventory, world, kb, shoot)):
             return True
 
     @classmethod
@@ -227,12 +371,12 @@ class Agent:
             target.append(adjacent)
             scream = world.kill_wumpus(target[-1].wpos)
             room.percept = world[room.wpos]
-            if 'B' not in room.percept:
+            if not room.percept & Percept.BREEZE:
                 target[-1].status = Status.SAFE
             if scream:
                 cls.remove_wumpus(kb, f'W{target[-1].pos}')
                 target[-1].status = Status.SAFE
-                if 'S' not in room.percept:
+                if not room.percept & Percept.STENCH:
                     cls.update(kb, room, mem.get_nearby(room.pos))
                     
                     if room.wpos not in shoot:
@@ -241,7 +385,7 @@ class Agent:
         adjacents = [adjacent for adjacent in adjacents if adjacent.status == Status.SAFE]
         for adjacent in adjacents:
             
-            if adjacent.status == Status.SAFE and cls.__search(adjacent, room, path, mem, inventory, world, kb, shoot):
+            if adjacent.status == Status.SAFE and (yield cls.__search(adjacent, room, path, mem, inventory, world, kb, shoot)):
                 return True
 
     @classmethod
@@ -251,13 +395,13 @@ class Agent:
             return False
         room.percept = world[room.wpos]
         
-        path.append((room, room.wpos, deepcopy(room.percept)))
-        if 'W' in room.percept:
+        path.append((room, room.wpos, room.percept))
+        if room.percept & Percept.WUMPUS:
             return True
-        if 'P' in room.percept:
+        if room.percept & Percept.PIT:
             return True
-        if 'G' in room.percept:
-            room.percept = room.percept.replace('G', 'E')
+        if room.percept & Percept.GOLD:
+            room.percept = room.percept & ~Percept.GOLD | Percept.EMPTY
             world.pickup_gold(room.wpos)
             inventory.add(room.wpos)
         wadjacents = world.get_adjacents(room.wpos)
@@ -268,42 +412,42 @@ class Agent:
         if room.status != Status.EXPLORED:
             cls.update(kb, room, adjacents)
             room.status = Status.EXPLORED
-        if 'B' in room.percept:
+        if room.percept & Percept.BREEZE:
             for adjacent in adjacents:
                 if cls.infer(kb, {f'P{adjacent.pos}': 1}):
                     cls.update(kb, room, adjacents)
                     adjacent.status = Status.UNSAFE
                 elif not cls.infer(kb, {f'P{adjacent.pos}': 0}):
                     adjacent.status = Status.UNSAFE
-        if 'S' in room.percept:
+        if room.percept & Percept.STENCH:
             for adjacent in adjacents:
                 if cls.infer(kb, {f'W{adjacent.wpos}': 1}):
                     cls.update(kb, room, adjacents)
                     adjacent.status = Status.UNSAFE
                 elif not cls.infer(kb, {f'W{adjacent.pos}': 0}):
                     adjacent.status = Status.UNSAFE
-        if room.percept == '' or room.percept == 'E' or room.percept == 'K':
+        if room.percept == 0 or room.percept == Percept.EMPTY or room.percept == Percept.KILLED:
             for adjacent in adjacents:
                 adjacent.status = Status.SAFE
         if len(adjacents) == 0:
             if not mem.is_explored():
                 nextad = cls.ucs(mem, room, parent, path)   
                 if nextad != None:
-                    if cls.__search(nextad[0], nextad[1], path, mem, inventory, world, kb, shoot):          
+                    if (yield cls.__search(nextad[0], nextad[1], path, mem, inventory, world, kb, shoot)):
                         return True
                 else:
-                    path.append((parent, parent.wpos, deepcopy(parent.percept)))
+                    path.append((parent, parent.wpos, parent.percept))
                     return False
             else:
                 return True
         else:
-            if 'S' in room.percept and 'B' in room.percept:
-                if cls.__shoot_until_scream(room, path, mem, inventory, world, kb, shoot):
+            if room.percept & Percept.STENCH and room.percept & Percept.BREEZE:
+                if (yield cls.__shoot_until_scream(room, path, mem, inventory, world, kb, shoot)):
                     return True
-            elif 'S' in room.percept:
-                if cls.__shoot_until_scream(room, path, mem, inventory, world, kb, shoot):
+            elif room.percept & Percept.STENCH:
+                if (yield cls.__shoot_until_scream(room, path, mem, inventory, world, kb, shoot)):
                     return True
-            elif 'B' in room.percept:
+            elif room.percept & Percept.BREEZE:
                 if mem.is_explored():
                     return True
                 else:
@@ -311,66 +455,58 @@ class Agent:
                     if len(adjacents) == 0:
                         next_room = cls.ucs(mem, room, parent, path)  
                         if next_room != None:
-                            if cls.__search(next_room[0], next_room[1], path, mem, inventory, world, kb, shoot):            
+                            if (yield cls.__search(next_room[0], next_room[1], path, mem, inventory, world, kb, shoot)):
                                 return True
                         else:
-                            path.append((parent, parent.wpos, deepcopy(parent.percept)))
+                            path.append((parent, parent.wpos, parent.percept))
                             return False
                     else:
-                        if cls.__search(adjacents[0], room, path, mem, inventory, world, kb, shoot):
+                        if (yield cls.__search(adjacents[0], room, path, mem, inventory, world, kb, shoot)):
                             return True
             else:
                 for adjacent in adjacents:
-                    if adjacent.status == Status.SAFE and cls.__search(adjacent, room, path, mem, inventory, world, kb, shoot):
+                    if adjacent.status == Status.SAFE and (yield cls.__search(adjacent, room, path, mem, inventory, world, kb, shoot)):
                         return True
         if parent != None:
             next_res = cls.ucs(mem, room, parent, path) 
             if next_res != None:
-                if cls.__search(next_res[0], next_res[1], path, mem, inventory, world, kb, shoot):
+                if (yield cls.__search(next_res[0], next_res[1], path, mem, inventory, world, kb, shoot)):
                     return True     
             else:
-                path.append((parent, parent.wpos, deepcopy(parent.percept)))
+                path.append((parent, parent.wpos, parent.percept))
                 return False           
         return True
     
     @classmethod
     def ucs(cls, map: Map, init_room: Room, parent_init_room: Room, path: deque):
-        frontier = PriorityQueue()
-        frontier.put((0, init_room.pos))
-        
-        map_data = map.data()
-        
+        frontier = [(0, map.cell(init_room.pos))]
+
         visited = set()
         paths = {}
         paths[init_room] = None
         safe_room = None
-        
-        while not frontier.empty():
-            cost, room_pos = frontier.get_nowait()
-            room = map.__getitem__(room_pos)
-            
+
+        while frontier:
+            cost, cell = heapq.heappop(frontier)
+            room = map.room(cell)
+
             if room.status == Status.SAFE:
                 safe_room = room
                 break
-            
+
             if room in visited:
                 continue
             visited.add(room)
 
-            raw_neighbors = map.get_nearby(room_pos)
-            neighbors = []
-            for row in map_data:
-                for neighborroom in row:
-                    if neighborroom in raw_neighbors:
-                        if neighborroom.status == Status.EXPLORED or neighborroom.status == Status.SAFE:
-                            neighbors.append(neighborroom)
-                                
-            for neighbor in neighbors:
+            for neighbor_cell in map.adjacent_cells(cell):
+                neighbor = map.room(neighbor_cell)
+                if neighbor.status != Status.EXPLORED and neighbor.status != Status.SAFE:
+                    continue
                 if neighbor in visited:
                     continue
                 paths[neighbor] = room
-                frontier.put((cost + 1, neighbor.pos))
-    
+                heapq.heappush(frontier, (cost + 1, neighbor_cell))
+
         back_room = safe_room
         if back_room != None:
             reverse_path = []
@@ -384,9 +520,9 @@ class Agent:
                 if pathe == reverse_path[-1]:
                     break
                 if pathe[1] == None:
-                    path.append((pathe[0], parent_init_room, deepcopy(pathe[0].percept)))
+                    path.append((pathe[0], parent_init_room, pathe[0].percept))
                 else:
-                    path.append((pathe[0], pathe[1], deepcopy(pathe[0].percept)))
+                    path.append((pathe[0], pathe[1], pathe[0].percept))
             return reverse_path[-1]
         else:
             return None
@@ -411,20 +547,23 @@ class Agent:
         but the agent has not go to the exit room before, it has to continue the exploration by go one step randomly.
 
         This returns the list of path in form of coordinations of room.
-        '''
 
-        frontier = PriorityQueue()
-        frontier.put((cls.manhattan_heuristic(agent_pos.wpos, goal_pos.wpos), (0, agent_pos.pos)))
+        The way to the exit room is taken from the exit tree of the map, the search only runs for other goals.
+        '''
+        if goal_pos.wpos == (1, 1):
+            cells = map.exit_path(map.cell(agent_pos.pos))
+            if cells is not None:
+                return [map.room(cell) for cell in reversed(cells[1:])]
 
-        map_data = map.data()
+        frontier = [(cls.manhattan_heuristic(agent_pos.wpos, goal_pos.wpos), 0, map.cell(agent_pos.pos))]
 
         visited = set()
         path = {}
         path[agent_pos] = None
-        while not frontier.empty():
-            _, (cost, agent) = frontier.get_nowait()
+        while frontier:
+            _, cost, cell = heapq.heappop(frontier)
 
-            agent = map.__getitem__(agent)
+            agent = map.room(cell)
 
             if agent == goal_pos:
                 break
@@ -433,20 +572,13 @@ class Agent:
                 continue
             visited.add(agent)
 
-
-            raw_neighbors = map.get_nearby(agent.pos)
-            neighbors = []
-            for row in map_data:
-                for room in row:
-                    if room in raw_neighbors:
-                        if room.status == Status.EXPLORED:
-                            neighbors.append(room)
-
-            for neighbor in neighbors:
-                if neighbor in visited:
+            for neighbor_cell in map.adjacent_cells(cell):
+                neighbor = map.room(neighbor_cell)
+                if neighbor.status != Status.EXPLORED or neighbor in visited:
                     continue
                 path[neighbor] = agent
-                frontier.put((cost + cls.manhattan_heuristic(neighbor.wpos, goal_pos.wpos) + 1, (cost + 1, neighbor.pos)))
+                heapq.heappush(frontier, (cost + cls.manhattan_heuristic(neighbor.wpos, goal_pos.wpos) + 1, cost + 1,
+                                          neighbor_cell))
         routine = cls.extract_final_path(path, goal_pos)
 
         return routine
@@ -518,7 +650,7 @@ class Agent:
             #Action
             if not path[i].percept: 
                 continue
-            if 'E' in path[i].percept and path[i].pos not in gold_obtained:
+            if path[i].percept & Percept.EMPTY and path[i].pos not in gold_obtained:
                 motions.append(Action.GRAB)
                 gold_obtained.add(path[i].pos)
             
@@ -532,15 +664,15 @@ class Agent:
                 #     continue
                 # if path[i+1].wpos == (6, 3):
                 #     print('(6, 3)', path[i+1].percept)
-                # if 'K' in path[i+1].percept and path[i+1].wpos not in shooted_wumpus: 
+                # if path[i+1].percept & Percept.KILLED and path[i+1].wpos not in shooted_wumpus: 
                 #     print("test:  ", path[i+1].wpos)   
                 #     motions.append(Action.SHOOT)
                 #     shooted_wumpus.add(path[i+1].wpos)
 
-            if 'W' in path[i].percept:
+            if path[i].percept & Percept.WUMPUS:
                 motions.append(Action.EATEN_BY_WUMPUS)
                 
-            if 'P' in path[i].percept:
+            if path[i].percept & Percept.PIT:
                 motions.append(Action.FALL_INTO_PIT)
         
         return motions
@@ -552,7 +684,7 @@ class Agent:
         inventory = set()
         memory = Map(self.world, self.current)
         shoot = {}
-        self.__search(self.current, None, path, memory, inventory, self.world, self.kb, shoot)
+        self.__explore(self.__search(self.current, None, path, memory, inventory, self.world, self.kb, shoot))
 
         # for m in memory.data():
         #     for room in m:
@@ -567,16 +699,16 @@ class Agent:
             # print("PATH: ", room[0].wpos)
             if (room[0].wpos == (1,1)):
                 goal = room[0]
-            if 'B' in room[0].percept and 'S' in room[0].percept:
+            if room[0].percept & Percept.BREEZE and room[0].percept & Percept.STENCH:
                 stench_breeze_room.append(room[0])
             else:
-                if 'B' in room[0].percept:
+                if room[0].percept & Percept.BREEZE:
                     breeze_room.append(room[0])
-                if 'S' in room[0].percept:
+                if room[0].percept & Percept.STENCH:
                     stench_room.append(room[0])
             routine.append(room[0])
             
-        print("SHOOT: ", shoot)
+        tracing.emit(tracing.DEBUG, 'shoot', shoot=shoot)
         
         if goal: 
             path_to_exit = self.Astar(memory, routine[-1], goal)
@@ -587,7 +719,7 @@ class Agent:
         
         else:
             
-            print(":( map is unsolvable")
+            tracing.emit(tracing.INFO, 'unsolvable')
             
         # raw_neighbors = memory.get_nearby((10,3))
         # print("neighbors:  ", raw_neighbors)
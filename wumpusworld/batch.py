@@ -0,0 +1,89 @@
+# Run the agent on many maps without the UI and write one row of results per map, e.g.
+#   python ./wumpusworld/batch.py resources/maps -o results.csv
+#   python ./wumpusworld/batch.py 'resources/maps/*.txt' -o results.json --workers 4
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import engine
+
+FIELDS = ['map', 'solved', 'score', 'steps', 'golds', 'arrows', 'died', 'propagations', 'solves',
+          'search_seconds', 'seconds', 'error']
+
+
+def find_maps(patterns):
+    """Expand directories (to their .txt files) and glob patterns into a sorted list of map files."""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(glob.glob(os.path.join(pattern, '*.txt')))
+        else:
+            paths.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def evaluate(path: str):
+    """Play the game on a map.
+    :param path: path to the map file
+    :returns: a dictionary with a value for every field, a map that could not be played has its error set
+    """
+    row = dict.fromkeys(FIELDS)
+    row['map'] = path
+    start = time.time()
+    try:
+        simulation = engine.simulate(path)
+    except Exception as error:
+        row['error'] = f'{type(error).__name__}: {error}'
+    else:
+        row.update(solved=simulation.solved, score=simulation.score, steps=simulation.steps, golds=simulation.golds,
+                   arrows=simulation.arrows, died=simulation.died, search_seconds=simulation.seconds)
+        row.update(simulation.agent.kb.stats)
+    row['seconds'] = time.time() - start
+    return row
+
+
+def write(rows, output):
+    """Write the rows as JSON if the output ends with .json, as CSV otherwise."""
+    if output.name.endswith('.json'):
+        json.dump(rows, output, indent=2)
+        output.write('\n')
+    else:
+        writer = csv.DictWriter(output, FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the agent on many maps and report the results of every map.')
+    parser.add_argument('maps', nargs='+', help='map files, directories of .txt maps or glob patterns')
+    parser.add_argument('-o', '--output', help='a .csv or .json file to write the results to (default: CSV to stdout)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(),
+                        help='number of processes (default: all cores), 1 runs the maps in this process')
+    args = parser.parse_args(argv)
+
+    paths = find_maps(args.maps)
+    if not paths:
+        parser.error('no map files found')
+    start = time.time()
+    if args.workers == 1:
+        rows = [evaluate(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            rows = list(executor.map(evaluate, paths, chunksize=max(1, len(paths) // (8 * args.workers))))
+
+    if args.output is None:
+        write(rows, sys.stdout)
+    else:
+        with open(args.output, 'w', newline='') as output:
+            write(rows, output)
+    solved = sum(1 for row in rows if row['solved'])
+    failed = sum(1 for row in rows if row['error'])
+    print(f'{len(rows)} maps, {solved} solved, {failed} failed in {time.time() - start:.2f}s', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
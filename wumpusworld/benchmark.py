@@ -0,0 +1,193 @@
+# Benchmarks of the world loading, the knowledge base and the agent on generated maps of growing size, e.g.
+#   python ./wumpusworld/benchmark.py --save baseline.json
+#   python ./wumpusworld/benchmark.py --compare baseline.json
+# Every case reports the time spent in read_map, in the whole search and in the calls of Agent.infer, Agent.ucs,
+# Agent.Astar and KnowledgeBase.solve made by the search, the time of solving the final knowledge base, the number of
+# knowledge base calls and the peak memory of a second, traced run of the search.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from agent import Agent
+import generator
+from sat_solver import KnowledgeBase
+from world import WumpusWorld as World
+
+SIZES = [10, 25, 50, 100, 200]
+PITS = [0.05, 0.15]
+WUMPUSES = [0.05]
+GOLDS = 0.05
+METHODS = [(Agent, 'infer'), (Agent, 'ucs'), (Agent, 'Astar'), (KnowledgeBase, 'solve')]
+TIMES = ['load_seconds', 'search_seconds'] + [f'{cls.__name__}.{name}_seconds' for cls, name in METHODS] + \
+        ['kb_solve_seconds']
+NOISE = 0.001 # times below this many seconds are not compared
+
+
+class Timer:
+    """Count the calls of methods and the time spent in them while in a with block. A call made inside another call of
+    the same method is counted but its time is not, so recursion is not timed twice."""
+
+    def __init__(self, methods):
+        self.methods = methods
+        self.calls = {f'{cls.__name__}.{name}': 0 for cls, name in methods}
+        self.seconds = {f'{cls.__name__}.{name}': 0.0 for cls, name in methods}
+        self.__originals = []
+
+    def __wrap(self, key, function):
+        depth = [0]
+
+        def timed(*args, **kwargs):
+            self.calls[key] += 1
+            if depth[0]:
+                return function(*args, **kwargs)
+            depth[0] += 1
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.seconds[key] += time.perf_counter() - start
+                depth[0] -= 1
+        return timed
+
+    def __enter__(self):
+        for cls, name in self.methods:
+            original = cls.__dict__[name]
+            key = f'{cls.__name__}.{name}'
+            if isinstance(original, classmethod):
+                setattr(cls, name, classmethod(self.__wrap(key, original.__func__)))
+            else:
+                setattr(cls, name, self.__wrap(key, original))
+            self.__originals.append((cls, name, original))
+        return self
+
+    def __exit__(self, *args):
+        for cls, name, original in self.__originals:
+            setattr(cls, name, original)
+        self.__originals.clear()
+
+
+def run_case(path: str, memory: bool):
+    """Measure one map.
+    :param path: path to the map file
+    :param memory: whether to run the search a second time under tracemalloc for its peak memory
+    :returns: a dictionary of the measurements
+    """
+    result = {}
+    start = time.perf_counter()
+    world = World(path)
+    result['load_seconds'] = time.perf_counter() - start
+    agent = Agent(world)
+    with Timer(METHODS) as timer:
+        start = time.perf_counter()
+        try:
+            result['solved'] = bool(agent.search())
+        except RecursionError as error:
+            result['error'] = f'{type(error).__name__}: {error}'
+            return result
+        result['search_seconds'] = time.perf_counter() - start
+    for key in timer.calls:
+        result[f'{key}_calls'] = timer.calls[key]
+        result[f'{key}_seconds'] = timer.seconds[key]
+    result.update(agent.kb.stats)
+    start = time.perf_counter()
+    agent.kb.solve()
+    result['kb_solve_seconds'] = time.perf_counter() - start
+    if memory:
+        agent = Agent(World(path))
+        tracemalloc.start()
+        try:
+            agent.search()
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run(sizes, pits, wumpuses, seed: int, repeat: int, memory: bool):
+    """Measure every combination of size and densities, keeping the fastest of the repeated times."""
+    cases = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            for pit in pits:
+                for wumpus in wumpuses:
+                    path = os.path.join(directory, f'{size}-{pit}-{wumpus}.txt')
+                    generator.generate(path, size, pit, wumpus, GOLDS, seed, safe_start=True)
+                    case = {'size': size, 'pits': pit, 'wumpuses': wumpus, 'seed': seed}
+                    for i in range(repeat):
+                        result = run_case(path, memory and i == 0)
+                        for key, value in result.items():
+                            if key.endswith('_seconds') and key in case:
+                                case[key] = min(case[key], value)
+                            else:
+                                case[key] = value
+                    report(case)
+                    cases.append(case)
+    return cases
+
+
+def report(case):
+    """Print one line of a case."""
+    if 'error' in case:
+        print(f"{case['size']:>5} {case['pits']:>5} {case['wumpuses']:>5}  {case['error']}", flush=True)
+        return
+    methods = ' '.join(f"{name}={case[f'{cls.__name__}.{name}_calls']}/{case[f'{cls.__name__}.{name}_seconds'] * 1000:.1f}ms"
+                       for cls, name in METHODS)
+    peak = f"{case['peak_bytes'] / 1024:.0f}KiB" if 'peak_bytes' in case else '-'
+    print(f"{case['size']:>5} {case['pits']:>5} {case['wumpuses']:>5}  load={case['load_seconds'] * 1000:.1f}ms "
+          f"search={case['search_seconds'] * 1000:.1f}ms {methods} kb_solve={case['kb_solve_seconds'] * 1000:.1f}ms "
+          f"propagations={case['propagations']} solves={case['solves']} peak={peak}", flush=True)
+
+
+def compare(cases, baseline, tolerance: float):
+    """Compare the cases with the cases of a baseline of the same size, densities and seed.
+    :returns: the number of measurements that got worse by more than the tolerance
+    """
+    previous = {(case['size'], case['pits'], case['wumpuses'], case['seed']): case for case in baseline}
+    regressions = 0
+    for case in cases:
+        old = previous.get((case['size'], case['pits'], case['wumpuses'], case['seed']))
+        if old is None or 'error' in case or 'error' in old:
+            continue
+        for key in TIMES + ['peak_bytes']:
+            if key not in case or key not in old or (key.endswith('_seconds') and old[key] < NOISE):
+                continue
+            ratio = case[key] / old[key] if old[key] else float('inf')
+            if ratio > 1 + tolerance:
+                regressions += 1
+                print(f"REGRESSION size={case['size']} pits={case['pits']} wumpuses={case['wumpuses']} {key}: "
+                      f"{old[key]:.6g} -> {case[key]:.6g} ({ratio:.2f}x)")
+            elif ratio < 1 - tolerance:
+                print(f"improved size={case['size']} pits={case['pits']} wumpuses={case['wumpuses']} {key}: "
+                      f"{old[key]:.6g} -> {case[key]:.6g} ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the world loading, the knowledge base and the agent.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--pits', type=float, nargs='+', default=PITS, help='pit densities')
+    parser.add_argument('--wumpuses', type=float, nargs='+', default=WUMPUSES, help='wumpus densities')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='runs of every case, the fastest time is kept')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced run for the peak memory')
+    parser.add_argument('--save', help='write the results to this JSON file as a baseline')
+    parser.add_argument('--compare', help='compare the results with a baseline JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='relative change reported by --compare')
+    args = parser.parse_args(argv)
+
+    cases = run(args.sizes, args.pits, args.wumpuses, args.seed, args.repeat, not args.no_memory)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'cases': cases}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(cases, json.load(f)['cases'], args.tolerance)
+        print(f'{regressions} regressions')
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
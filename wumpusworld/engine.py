@@ -0,0 +1,104 @@
+# Headless simulation of a game. It runs the agent, applies its actions and keeps the score without importing pygame
+# or the UI, so maps can be evaluated on machines without a display. The UI in game.py replays a Simulation.
+import time
+from agent import Agent, Action
+from world import WumpusWorld as World
+import tracing
+
+INITIAL_SCORE = 10
+ACTION_COST = 10 # every action, including grabbing and shooting
+GOLD_REWARD = 1010
+ARROW_COST = 100 # every arrow of a shoot action
+CLIMB_REWARD = 10
+
+MOVES = {
+    Action.MOVE_RIGHT: (0, 1),
+    Action.MOVE_UP: (1, 0),
+    Action.MOVE_LEFT: (0, -1),
+    Action.MOVE_DOWN: (-1, 0),
+}
+
+
+class Simulation:
+    """A game played by the agent on a world."""
+
+    def __init__(self, world: World):
+        """Initialize the simulation.
+        :param world: the world to play on, the agent changes it while searching
+        """
+        self.world = world
+        self.agent = Agent(world)
+        self.position = world.agent
+        self.routine = None
+        self.actions = []
+        self.shoot = {}
+        self.volleys = []
+        self.score = INITIAL_SCORE
+        self.steps = 0
+        self.golds = 0
+        self.arrows = 0
+        self.shots = 0
+        self.died = False
+        self.solved = False
+        self.seconds = 0
+
+    def search(self):
+        """Let the agent search the world for its actions.
+        :returns: True if the agent found a way back to the exit, False otherwise
+        """
+        start = time.time()
+        found = self.agent.search()
+        self.seconds = time.time() - start
+        tracing.emit(tracing.INFO, 'search', seconds=self.seconds)
+        if found:
+            self.routine, self.actions, self.shoot = found
+            self.volleys = list(self.shoot.items())
+            self.solved = True
+        return self.solved
+
+    def apply(self, action: Action):
+        """Apply an action of the agent and update the score.
+        :param action: the action
+        :returns: a tuple of (position of the agent, positions the arrows were shot at) for a shoot action, None
+        otherwise
+        """
+        self.score -= ACTION_COST
+        self.steps += 1
+        volley = None
+        if action in MOVES:
+            dx, dy = MOVES[action]
+            self.position = self.position[0] + dx, self.position[1] + dy
+        elif action == Action.GRAB:
+            self.score += GOLD_REWARD
+            self.golds += 1
+        elif action == Action.SHOOT:
+            # the volleys are taken in the order the agent recorded them
+            volley = self.volleys[self.shots]
+            self.score -= ARROW_COST * len(volley[1])
+            self.arrows += len(volley[1])
+            self.shots += 1
+        elif action == Action.FALL_INTO_PIT or action == Action.EATEN_BY_WUMPUS:
+            self.died = True
+        return volley
+
+    def finish(self):
+        """Climb out of the cave."""
+        self.score += CLIMB_REWARD
+
+    def run(self):
+        """Play the whole game.
+        :returns: the simulation
+        """
+        self.search()
+        for action in self.actions:
+            self.apply(action)
+        self.finish()
+        return self
+
+
+def simulate(path: str):
+    """Play the game on a map file.
+    :param path: path to the map file
+    :returns: the finished simulation
+    """
+    return Simulation(World(path)).run()
@@ -1,13 +1,13 @@
 import ui
 import pygame
 import agent as Agent
-import time
+import engine
+import tracing
 
 class Visualizer:
     visual_grid = None
     agent = None
     score = 0
-    shot = 0
 
     @staticmethod
     def convert_x_coord_to_ui(x):
@@ -18,7 +18,7 @@ class Visualizer:
         return y - 1
 
 
-def move_player(player, action, shoot, shoot_keys):
+def move_player(player, action, simulation):
     if action == Agent.Action.MOVE_LEFT:
         player.left_pressed = True
     if action == Agent.Action.MOVE_RIGHT:
@@ -27,9 +27,10 @@ def move_player(player, action, shoot, shoot_keys):
         player.up_pressed = True
     if action == Agent.Action.MOVE_DOWN:
         player.down_pressed = True
-    Visualizer.score -= 10
+    volley = simulation.apply(action)
+    # the arrows are charged one by one while they fly
+    Visualizer.score = simulation.score + (engine.ARROW_COST * len(volley[1]) if volley else 0)
     if action == Agent.Action.GRAB:
-        Visualizer.score += 1010
         pygame.time.delay(500)
     is_moved = player.update()
 
@@ -52,22 +53,19 @@ def move_player(player, action, shoot, shoot_keys):
     if action == Agent.Action.SHOOT:
         # print(shoot)
         player.shoot = True
-        shoot_key = shoot_keys[Visualizer.shot]
-        for shot in shoot[Visualizer.shot]:
+        shoot_key, shots = volley
+        for shot in shots:
             player.update((Visualizer.convert_x_coord_to_ui(shot[0]), Visualizer.convert_y_coord_to_ui(shot[1]),
                            (Visualizer.convert_x_coord_to_ui(shoot_key[0]),
                             Visualizer.convert_y_coord_to_ui(shoot_key[1]))))
             # draw
             ui.draw(Visualizer.visual_grid, 10, 10, 0, 0)
             player.draw()
-            Visualizer.score -= 100
+            Visualizer.score -= engine.ARROW_COST
             ui.print_score(Visualizer.score)
             pygame.display.flip()
             pygame.time.delay(1000)
 
-
-        Visualizer.shot += 1
-
     player.left_pressed = False
     player.right_pressed = False
     player.up_pressed = False
@@ -78,7 +76,7 @@ def move_player(player, action, shoot, shoot_keys):
 
 def set_world(World):
     world = World.get_world()
-    print(world)
+    tracing.emit(tracing.DEBUG, 'world', rooms=world)
     for i in range(World.n):
         for j in range(World.n):
             if 'S' not in world[i][j]:
@@ -106,46 +104,23 @@ def set_world(World):
             if world[i][j] == 'A':
                 Visualizer.agent = (i, j)
 
-    for i in range(World.n):
-        for j in range(World.n):
-            if Visualizer.visual_grid[i][j].name == '':
-                print('0', end=' ')
-            print(Visualizer.visual_grid[i][j].name, end=' ')
-        print('\n')
+    if tracing.enabled(tracing.DEBUG):
+        tracing.emit(tracing.DEBUG, 'visual_grid',
+                     names=[[Visualizer.visual_grid[i][j].name or '0' for j in range(World.n)] for i in range(World.n)])
 
 
 
 
 def play_game(player, World):
-    agent = Agent.Agent(World)
-
-    start = time.time()
-    routine, actionk, shoot = agent.search()
-    end = time.time()
-    print('Exec time: ', end - start)
-
-    count = 0
-    move = []
-    shoot_list = list(shoot.values())
-    shoot_keys = list(shoot.keys())
-
-    if routine:
-        for i in routine:
-            action = [i.wpos]
-            if i.wpos in shoot:
-                action.append(shoot[i.wpos])
-                del shoot[i.wpos]
-            # print(action)
-
-            move.append(action)
-    # print(move)
-    # print(shoot)
-    print(shoot_list)
-    if actionk:
-        for i in range(len(actionk)):
-            move_player(player, actionk[i], shoot_list, shoot_keys)
-
-    Visualizer.score += 10
+    simulation = engine.Simulation(World)
+    simulation.search()
+    tracing.emit(tracing.DEBUG, 'shoot', shoot=simulation.shoot)
+
+    for action in simulation.actions:
+        move_player(player, action, simulation)
+
+    simulation.finish()
+    Visualizer.score = simulation.score
     ui.print_score(Visualizer.score)
 
 def setup_world(url):
@@ -219,8 +194,7 @@ def main(url):
                     run = False
                 if command == 1:
                     Visualizer.visual_grid = ui.make_grid(10, 10)
-                    Visualizer.shot = 0
-                    Visualizer.score = 10
+                    Visualizer.score = engine.INITIAL_SCORE
                     player, World = setup_world(url)
                     play_game(player, World)
                     play_again = True
@@ -0,0 +1,72 @@
+# Random maps in the format read by WumpusWorld.read_map, written row by row so the size is only limited by the disk, e.g.
+#   python ./wumpusworld/generator.py map.txt --size 1000 --pits 0.1 --wumpuses 0.05 --golds 0.05 --seed 1 --safe-gold
+import argparse
+import random
+
+ROOMS = ['-', 'P', 'W', 'G']
+
+
+def generate(path: str, n: int, pits=0.1, wumpuses=0.05, golds=0.05, seed=None, safe_gold=False, safe_start=False,
+             agent=(1, 1)):
+    """Write a random map. Every room independently holds a pit, a wumpus, a gold or nothing with the given densities,
+    the room of the agent has no pit and no wumpus.
+    :param path: path to the map file
+    :param n: size of the map
+    :param pits: probability of a pit in a room
+    :param wumpuses: probability of a wumpus in a room
+    :param golds: probability of a gold in a room
+    :param seed: seed of the random generator, the same seed and arguments give the same map
+    :param safe_gold: place a gold that the agent can reach through rooms without pits and wumpuses, the rooms of the
+    way are cleared along the row of the agent and then along the column of the gold
+    :param safe_start: keep pits and wumpuses out of the rooms next to the agent, so it perceives nothing at the start
+    :param agent: position (x, y) of the agent, (1, 1) is the bottom left room
+    :raises AssertionError: if the densities or the position of the agent are invalid
+    """
+    assert n > 0, 'Invalid size'
+    assert min(pits, wumpuses, golds) >= 0 and pits + wumpuses + golds <= 1, 'Invalid densities'
+    assert 1 <= agent[0] <= n and 1 <= agent[1] <= n, 'Invalid agent position'
+    rng = random.Random(seed)
+    empty = 1 - pits - wumpuses - golds
+    weights = [empty, empty + pits, empty + pits + wumpuses, 1] # cumulative, in the order of ROOMS
+    gold = (rng.randint(1, n), rng.randint(1, n)) if safe_gold else None
+    with open(path, 'w') as f:
+        f.write(f'{n}\n')
+        for x in range(n, 0, -1):
+            rooms = rng.choices(ROOMS, cum_weights=weights, k=n)
+            if gold is not None:
+                if x == agent[0]:
+                    for y in range(min(agent[1], gold[1]), max(agent[1], gold[1]) + 1):
+                        if rooms[y - 1] != 'G':
+                            rooms[y - 1] = '-'
+                if min(agent[0], gold[0]) <= x <= max(agent[0], gold[0]) and rooms[gold[1] - 1] != 'G':
+                    rooms[gold[1] - 1] = '-'
+                if x == gold[0]:
+                    rooms[gold[1] - 1] = 'G'
+            if safe_start and abs(x - agent[0]) <= 1:
+                for y in range(max(agent[1] - 1, 1), min(agent[1] + 1, n) + 1):
+                    if abs(x - agent[0]) + abs(y - agent[1]) == 1 and rooms[y - 1] != 'G':
+                        rooms[y - 1] = '-'
+            if x == agent[0]:
+                rooms[agent[1] - 1] = 'AG' if rooms[agent[1] - 1] == 'G' else 'A'
+            f.write('.'.join(rooms) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a random map.')
+    parser.add_argument('path', help='the map file to write')
+    parser.add_argument('--size', type=int, default=10)
+    parser.add_argument('--pits', type=float, default=0.1, help='probability of a pit in a room')
+    parser.add_argument('--wumpuses', type=float, default=0.05, help='probability of a wumpus in a room')
+    parser.add_argument('--golds', type=float, default=0.05, help='probability of a gold in a room')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--safe-gold', action='store_true', help='make a gold reachable without pits and wumpuses')
+    parser.add_argument('--safe-start', action='store_true', help='keep pits and wumpuses away from the agent')
+    parser.add_argument('--agent', type=int, nargs=2, default=(1, 1), metavar=('X', 'Y'),
+                        help='position of the agent, 1 1 is the bottom left room')
+    args = parser.parse_args(argv)
+    generate(args.path, args.size, args.pits, args.wumpuses, args.golds, args.seed, args.safe_gold, args.safe_start,
+             tuple(args.agent))
+
+
+if __name__ == '__main__':
+    main()
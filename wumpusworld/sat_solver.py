@@ -1,94 +1,391 @@
 # Note:
 # "Symbol(s)" are variable in a clause. For example, the clause A^B^C has 3 symbols are A,B, and C.
-# sign = 0 is possitive symbol, otherwise, sign = 1 is negation of the symbol.
-# clause[symbol] = sign. For example, ~A is stored as clause[A] = 1. Note that clause is a dictionary ==> A: 1, intuitively.
-# self.clauses is a dictionary contains list of clauses.
-# model: Assignment for each symbol. 
-import copy
-class KnowledgeBase:
-    
-    def __init__(self, status, clauses):
-        self.status = status # Does the problem solved successfully?
-        self.clauses = clauses # initial list of clauses (aka bootstrap_with)
-        
-    def KB_Initialize(self):
-        print("In progressing")
-        
-            
-    def add_clause(self, clauses):
-        for clause in clauses:
-            if clause in self.clauses:
-                return False
+# Clauses are given to the knowledge base as dictionaries: clause[symbol] = sign, sign = 0 is possitive symbol, otherwise,
+# sign = 1 is negation of the symbol. For example, ~A is given as clause[A] = 1.
+# Internally, every symbol name is interned once to a positive integer by the SymbolTable, and a clause is stored as a
+# sorted tuple of integer literals (DIMACS-style): A is stored as the integer of A, ~A as its negation.
+# Being sorted makes the tuple canonical: the same clause always gives the same tuple, so it can be hashed.
+# self.clauses is a dictionary used as an ordered set of the integer clauses (every value is None), and
+# self.index maps every symbol to the ordered set of the clauses that mention it.
+# The Solver never copies nor modifies these tuples, it only keeps which two literals of each clause are watched.
+
+
+class SymbolTable:
+    """Intern symbol names (e.g. 'P(0, 1)') to positive integers."""
+
+    def __init__(self):
+        self.__ids = {}
+        self.__names = [None]
+
+    def __len__(self):
+        return len(self.__names) - 1
+
+    def __contains__(self, name):
+        return name in self.__ids
+
+    def intern(self, name):
+        """Get the integer of a symbol, allocate a new one if the symbol is unknown."""
+        var = self.__ids.get(name)
+        if var is None:
+            var = len(self.__names)
+            self.__ids[name] = var
+            self.__names.append(name)
+        return var
+
+    def lookup(self, name):
+        """Get the integer of a symbol, or None if the symbol is unknown."""
+        return self.__ids.get(name)
+
+    def name(self, literal):
+        return self.__names[abs(literal)]
+
+    def encode(self, clause):
+        """Convert a dictionary clause into a sorted tuple of integer literals."""
+        return tuple(sorted(self.intern(symbol) if sign == 0 else -self.intern(symbol)
+                            for symbol, sign in clause.items()))
+
+    def decode(self, literals):
+        """Convert a tuple of integer literals back into a dictionary clause."""
+        return {self.name(literal): 0 if literal > 0 else 1 for literal in literals}
+
+
+class Solver:
+    """Unit propagation engine based on two watched literals.
+
+    Every clause of at least two literals watches two of its literals. Assigning a literal only visits the clauses
+    watching its negation, and a clause is moved to another watch when one of its unassigned literals can replace the
+    false one. Assignments are recorded on a trail split into decision levels, so undoing them is a matter of popping
+    the trail back to the start of a level.
+
+    The clauses are shared with the caller: the watched literals of a clause are kept in a separate pair, so the literal
+    tuples are never copied nor reordered.
+
+    A clause can be removed again as long as no fact at level 0 and no learnt clause may have come from it.
+
+    Each clause also counts its True literals, so the solver knows how many clauses are not satisfied yet. With
+    pure_literals, it keeps for every literal the number of unsatisfied clauses it occurs in, and the variables whose
+    counts reach or leave zero become candidates for pure_literal(), which then checks a candidate in O(1).
+    """
+
+    def __init__(self, size=0, heuristic=None, pure_literals=False):
+        self.heuristic = heuristic if heuristic is not None else FrequencyHeuristic() # decision heuristic
+        self.pure_literals = pure_literals # keep the occurrence counts of the literals up to date?
+        self.ok = True # False once an empty clause is derived at level 0
+        self.clauses = [] # (literals, watched pair)
+        self.occurrences = {} # literal -> indices of the clauses that contain the literal
+        self.true_counts = [] # clause index -> number of True literals in the clause
+        self.unsatisfied = 0 # number of clauses without True literals
+        self.counts = {} # literal -> number of unsatisfied clauses that contain the literal
+        self.pure_candidates = set() # variables that may have become pure
+        self.learnts = [] # (literals, watched pair) of the clauses learnt from conflicts
+        self.learnt_units = 0 # number of learnt clauses of one literal, they are only assigned at level 0
+        self.watches = {} # literal -> clauses watching the literal
+        self.assigns = [0] * (size + 1) # var -> 1 (True), -1 (False) or 0 (unassigned)
+        self.levels = [0] * (size + 1) # var -> decision level of the assignment
+        self.reasons = [None] * (size + 1) # var -> literals of the clause that implied the assignment
+        self.trail = []
+        self.trail_lim = [] # trail index where each decision level starts
+        self.qhead = 0 # next trail literal to propagate
+        self.heuristic.reserve(size)
+        if pure_literals:
+            self.pure_candidates.update(range(1, size + 1))
+
+    def reserve(self, size):
+        """Make room for the variables up to size."""
+        grow = size + 1 - len(self.assigns)
+        if grow > 0:
+            if self.pure_literals:
+                self.pure_candidates.update(range(len(self.assigns), size + 1))
+            self.assigns.extend([0] * grow)
+            self.levels.extend([0] * grow)
+            self.reasons.extend([None] * grow)
+        self.heuristic.reserve(size)
+
+    def value(self, literal):
+        """1 if the literal is True, -1 if it is False, 0 if unassigned."""
+        if literal > 0:
+            return self.assigns[literal]
+        return -self.assigns[-literal]
+
+    def decision_level(self):
+        return len(self.trail_lim)
+
+    def add_clause(self, literals):
+        """Add a clause at decision level 0, return False if the solver becomes inconsistent."""
+        if not self.ok:
+            return False
+        unassigned = []
+        for literal in literals:
+            value = self.value(literal)
+            if value == 1:
+                return True
+            if value == 0:
+                unassigned.append(literal)
+        if not unassigned:
+            self.ok = False
+        elif len(unassigned) == 1:
+            self.assign(unassigned[0], literals)
+            self.ok = self.propagate() is None
+        else:
+            clause = (literals, [unassigned[0], unassigned[1]])
+            index = len(self.clauses)
             self.clauses.append(clause)
+            self.watches.setdefault(unassigned[0], []).append(clause)
+            self.watches.setdefault(unassigned[1], []).append(clause)
+            for literal in literals:
+                self.occurrences.setdefault(literal, []).append(index)
+            self.true_counts.append(0)
+            self.unsatisfied += 1
+            if self.pure_literals:
+                self.__count(literals, 1)
+        return self.ok
+
+    def remove_clause(self, literals):
+        """Remove a clause given to add_clause, at decision level 0.
+        :returns: False if the solver may have derived facts or learnt clauses from it, then it has to be rebuilt
+        """
+        if not self.ok or self.learnts or self.learnt_units:
+            return False
+        if any(self.assigns[abs(literal)] != 0 and self.reasons[abs(literal)] == literals for literal in literals):
+            return False
+        # A clause that was satisfied when it was added is not stored.
+        index = next((index for index in self.occurrences.get(literals[0], ()) if self.clauses[index][0] == literals),
+                     None)
+        if index is None:
+            return True
+        clause = self.clauses[index]
+        for literal in clause[1]:
+            watchers = self.watches[literal]
+            del watchers[next(position for position, other in enumerate(watchers) if other is clause)]
+        for literal in literals:
+            self.occurrences[literal].remove(index)
+        if self.true_counts[index] == 0:
+            self.unsatisfied -= 1
+            if self.pure_literals:
+                self.__count(literals, -1)
+        self.clauses[index] = None
         return True
-        
-    def del_clause(self, symbol):
+
+    def __count(self, literals, delta):
+        """Add delta to the occurrence counts of the literals of a clause that becomes unsatisfied or satisfied."""
+        counts = self.counts
+        for literal in literals:
+            count = counts.get(literal, 0) + delta
+            counts[literal] = count
+            if count == 0 or (count == 1 and delta > 0):
+                self.pure_candidates.add(abs(literal))
+
+    def assign(self, literal, reason):
+        var = abs(literal)
+        self.assigns[var] = 1 if literal > 0 else -1
+        self.levels[var] = len(self.trail_lim)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+        occurrences = self.occurrences.get(literal)
+        if occurrences:
+            true_counts = self.true_counts
+            for index in occurrences:
+                true_counts[index] += 1
+                if true_counts[index] == 1:
+                    self.unsatisfied -= 1
+                    if self.pure_literals:
+                        self.__count(self.clauses[index][0], -1)
+
+    def new_decision_level(self):
+        self.trail_lim.append(len(self.trail))
+
+    def decide(self, literal):
+        """Open a new decision level and assign the literal in it."""
+        self.new_decision_level()
+        self.assign(literal, None)
+
+    def propagate(self):
+        """Propagate the pending assignments, return the literals of a conflicting clause or None."""
+        trail = self.trail
+        watches = self.watches
+        value = self.value
+        while self.qhead < len(trail):
+            false_literal = -trail[self.qhead]
+            self.qhead += 1
+            watchers = watches.get(false_literal)
+            if not watchers:
+                continue
+            kept = []
+            conflict = None
+            for index, clause in enumerate(watchers):
+                literals, watched = clause
+                slot = 0 if watched[0] == false_literal else 1
+                other = watched[1 - slot]
+                if value(other) == 1:
+                    kept.append(clause)
+                    continue
+                for literal in literals:
+                    if literal != other and literal != false_literal and value(literal) != -1:
+                        watched[slot] = literal
+                        watches.setdefault(literal, []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value(other) == -1:
+                        conflict = literals
+                        kept.extend(watchers[index + 1:])
+                        break
+                    self.assign(other, literals)
+            watches[false_literal] = kept
+            if conflict is not None:
+                self.qhead = len(trail)
+                return conflict
+        return None
+
+    def backtrack(self, level):
+        """Undo every assignment above the decision level."""
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        true_counts = self.true_counts
+        for literal in self.trail[start:]:
+            self.assigns[abs(literal)] = 0
+            self.reasons[abs(literal)] = None
+            self.heuristic.unassigned(literal)
+            for index in self.occurrences.get(literal, ()):
+                true_counts[index] -= 1
+                if true_counts[index] == 0:
+                    self.unsatisfied += 1
+                    if self.pure_literals:
+                        self.__count(self.clauses[index][0], 1)
+            if self.pure_literals:
+                self.pure_candidates.add(abs(literal))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def pure_literal(self):
+        """An unassigned literal whose negation does not occur in the unsatisfied clauses, or None."""
+        candidates = self.pure_candidates
+        counts = self.counts
+        while candidates:
+            var = candidates.pop()
+            if self.assigns[var] != 0:
+                continue
+            positive = counts.get(var, 0)
+            negative = counts.get(-var, 0)
+            if positive and not negative:
+                return var
+            if negative and not positive:
+                return -var
+        return None
+
+    def analyze(self, conflict):
+        """First UIP conflict analysis.
+        :param conflict: literals of the conflicting clause
+        :returns: a tuple of (learnt clause, backjump level), the first literal of the clause is the negation of the
+        first unique implication point and becomes unit at the backjump level
+        """
+        level = self.decision_level()
+        seen = set()
+        learnt = [None]
+        counter = 0 # seen literals of the current level that are not resolved yet
+        index = len(self.trail) - 1
+        literal = None
+        reason = conflict
+        while True:
+            for other in reason:
+                var = abs(other)
+                if other == literal or var in seen or self.levels[var] == 0:
+                    continue
+                seen.add(var)
+                self.heuristic.bump(var)
+                if self.levels[var] == level:
+                    counter += 1
+                else:
+                    learnt.append(other)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            reason = self.reasons[abs(literal)]
+        learnt[0] = -literal
+        self.heuristic.decay()
+
+        if len(learnt) == 1:
+            return tuple(learnt), 0
+        # Watch the literal of the highest level besides the asserting one.
+        highest = max(range(1, len(learnt)), key=lambda position: self.levels[abs(learnt[position])])
+        learnt[1], learnt[highest] = learnt[highest], learnt[1]
+        return tuple(learnt), self.levels[abs(learnt[1])]
+
+    def learn(self, literals):
+        """Add a learnt clause after backjumping, and assign its asserting literal."""
+        if len(literals) > 1:
+            clause = (literals, [literals[0], literals[1]])
+            self.learnts.append(clause)
+            self.watches.setdefault(literals[0], []).append(clause)
+            self.watches.setdefault(literals[1], []).append(clause)
+        else:
+            self.learnt_units += 1
+        self.assign(literals[0], literals)
+
+    def unresolved(self):
+        """The unassigned literals of every clause that is not satisfied yet."""
+        current_clauses = []
         for clause in self.clauses:
-            if symbol in list(clause.keys()):
-                self.clauses.remove(clause)
-                return True
-        return False
-        
-        
-    # Pure symbols are symbols that always be positive (or negative) in the clause dictionary. This symbol should be replaced by a corresponding constant (positive
-    # or negative) to enhance the performance of the SAT Solver Algorithm.
-    def extractPureSymbols(self, symbols, current_clauses):
-        pured_symbols = []
-        for symbol in symbols:
-            isPos = False # is the symbol positive?
-            isNeg = False # Is there negation in the symbol?
-            
-            for clause in current_clauses:
-
-                if symbol in clause:
-                    if clause[symbol] == 1:
-                        isNeg = True 
-                    elif clause[symbol] == 0:
-                        isPos = True 
-                    
-                    if isPos and isNeg:
-                        break 
-                    
-            if not isPos:
-                return symbol, 1
-            
-            if not isNeg:
-                return symbol, 0
-        return None, None
-                
+            if clause is None: # removed
+                continue
+            remaining = []
+            literals = clause[0]
+            for literal in literals:
+                value = self.value(literal)
+                if value == 1:
+                    break
+                if value == 0:
+                    remaining.append(literal)
+            else:
+                current_clauses.append(remaining)
+        return current_clauses
 
-    # Unit clauses are clauses that contains only one symbol (e.g, A).
-    def extractUnitClauses(self, current_clauses):
-        for clause in current_clauses:
-            if len(clause) == 1:
-                symbol = list(clause.keys())[0]
-                return symbol, clause[symbol]
-        return None, None
-    
-    def listSymbols(self, listOfClauses):
-        res = []
-        for clause in listOfClauses:
-            for symbol in clause:
-                res.append(symbol)
-        return res
-    
-    
-    def selection(self, clauses, symbols):          
+
+class FrequencyHeuristic:
+    """Branch on the symbol that occurs the most in the clauses that are not satisfied yet, with its most frequent sign.
+
+    Counting is done over every unresolved clause, so a decision costs O(total literals).
+    """
+
+    def reserve(self, size):
+        pass
+
+    def bump(self, var):
+        pass
+
+    def decay(self):
+        pass
+
+    def unassigned(self, literal):
+        pass
+
+    def pick(self, solver):
+        """The literal to decide next, or None if every clause is satisfied."""
+        current_clauses = solver.unresolved()
+        if not current_clauses:
+            return None
 
         repeat = {}
         pos_neg = {} # format: [positive_count, negative_count]
         
-        for clause in clauses:
-            for symbol in clause:
+        for clause in current_clauses:
+            for literal in clause:
+                symbol = abs(literal)
                 if symbol not in repeat:
                     repeat[symbol] = 0
                     pos_neg[symbol] = [0,0] 
                 repeat[symbol] += 1
-                if clause[symbol] == 0:
+                if literal > 0:
                     pos_neg[symbol][0] += 1
-                elif clause[symbol] == 1:
+                else:
                     pos_neg[symbol][1] += 1
-        max = symbols[0]
+        max = None
         iteratorMaxValue = 0
         for symbolTemp in repeat:
             if iteratorMaxValue < repeat[symbolTemp]:
@@ -96,148 +393,556 @@ class KnowledgeBase:
                 iteratorMaxValue = repeat[symbolTemp]
 
         if pos_neg[max][0]>pos_neg[max][1]:
-            return max, 0
+            return max
         else:
-            return max, 1
+            return -max
+
+
+class VSIDSHeuristic:
+    """Variable State Independent Decaying Sum with phase saving.
+
+    Every variable met during a conflict analysis gets its activity bumped, and the bump grows after each conflict so
+    that recent conflicts weigh more. The unassigned variables are kept in a binary max-heap of activities, so picking
+    the next decision is O(log n). A variable is decided with the sign it had when it was last unassigned.
+    """
+
+    def __init__(self, decay=0.95):
+        self.activity = [0.0] # var -> activity
+        self.phases = [False] # var -> saved sign, True for positive
+        self.heap = [] # variables ordered by activity
+        self.indices = [-1] # var -> position in the heap, -1 if not in the heap
+        self.increment = 1.0
+        self.factor = 1 / decay
+
+    def reserve(self, size):
+        for var in range(len(self.activity), size + 1):
+            self.activity.append(0.0)
+            self.phases.append(False)
+            self.indices.append(-1)
+            self.insert(var)
+
+    def insert(self, var):
+        if self.indices[var] < 0:
+            self.indices[var] = len(self.heap)
+            self.heap.append(var)
+            self.__sift_up(len(self.heap) - 1)
+
+    def bump(self, var):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+        if self.indices[var] >= 0:
+            self.__sift_up(self.indices[var])
+
+    def decay(self):
+        self.increment *= self.factor
+
+    def unassigned(self, literal):
+        var = abs(literal)
+        self.phases[var] = literal > 0
+        self.insert(var)
 
+    def pick(self, solver):
+        """The literal to decide next, or None if every variable is assigned."""
+        while self.heap:
+            var = self.__pop()
+            if solver.assigns[var] == 0:
+                return var if self.phases[var] else -var
+        return None
+
+    def __before(self, a, b):
+        return self.activity[a] > self.activity[b] or (self.activity[a] == self.activity[b] and a < b)
+
+    def __pop(self):
+        heap = self.heap
+        var = heap[0]
+        last = heap.pop()
+        self.indices[var] = -1
+        if heap:
+            heap[0] = last
+            self.indices[last] = 0
+            self.__sift_down(0)
+        return var
+
+    def __sift_up(self, position):
+        heap = self.heap
+        var = heap[position]
+        while position > 0:
+            parent = (position - 1) // 2
+            if not self.__before(var, heap[parent]):
+                break
+            heap[position] = heap[parent]
+            self.indices[heap[position]] = position
+            position = parent
+        heap[position] = var
+        self.indices[var] = position
+
+    def __sift_down(self, position):
+        heap = self.heap
+        var = heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= len(heap):
+                break
+            if child + 1 < len(heap) and self.__before(heap[child + 1], heap[child]):
+                child += 1
+            if not self.__before(heap[child], var):
+                break
+            heap[position] = heap[child]
+            self.indices[heap[position]] = position
+            position = child
+        heap[position] = var
+        self.indices[var] = position
+
+
+HEURISTICS = {'frequency': FrequencyHeuristic, 'vsids': VSIDSHeuristic}
+
+
+def luby(index):
+    """The index-th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ..."""
+    size, power = 1, 0
+    while size < index + 1:
+        size = 2 * size + 1
+        power += 1
+    while size - 1 != index:
+        size = (size - 1) // 2
+        power -= 1
+        index %= size
+    return 2 ** power
+
+
+class KnowledgeBase:
     
-    # Solving problem using DBLL
-    def dpll(self, current_clauses, model, symbols):
-        visited=[]
-        # model = {} # Assignment for each symbol
-        # symbols = self.listSymbols(current_clauses)
+    def __init__(self, status, clauses, mode='dpll', heuristic='frequency'):
+        assert mode in ('dpll', 'cdcl'), 'Invalid mode'
+        assert heuristic in HEURISTICS, 'Invalid heuristic'
+        self.status = status # Does the problem solved successfully?
+        self.mode = mode # search algorithm of solve(), 'dpll' or 'cdcl'
+        self.heuristic = heuristic # decision heuristic of the solver, a key of HEURISTICS
+
+        self.symbols = SymbolTable()
+        self.clauses = {} # initial list of clauses (aka bootstrap_with)
+        self.index = {} # symbol -> clauses mentioning the symbol
+        for clause in clauses:
+            self.__insert(self.symbols.encode(clause))
+        self.__solver = None # persistent solver, built on the first solve and fed by add_clause afterwards
+        self.__refuted = set() # literals of the queries known to be unsatisfiable with the kb
+        self.__model = None # var -> 1, -1 or 0 (free), an assignment satisfying every clause, None if unknown
+        self.stats = {'propagations': 0, 'solves': 0} # queries decided by propagation, searches of the solver
+
+    def __contains__(self, clause):
+        if any(symbol not in self.symbols for symbol in clause):
+            return False
+        return self.symbols.encode(clause) in self.clauses
+
+    def __insert(self, literals):
+        self.clauses[literals] = None
+        for literal in literals:
+            self.index.setdefault(abs(literal), {})[literals] = None
+
+    def __remove(self, literals):
+        del self.clauses[literals]
+        for literal in literals:
+            del self.index[abs(literal)][literals]
+
+    def __extend_model(self, literals):
+        """Keep the model satisfying a new clause, by setting one of its free symbols if needed, or drop it."""
+        model = self.__model
+        if model is None:
+            return
+        model.extend([0] * (len(self.symbols) + 1 - len(model)))
+        free = None
+        for literal in literals:
+            value = model[abs(literal)] if literal > 0 else -model[abs(literal)]
+            if value == 1:
+                return
+            if value == 0 and free is None:
+                free = literal
+        if free is None:
+            self.__model = None
+        else:
+            model[abs(free)] = 1 if free > 0 else -1
+
+    def KB_Initialize(self):
+        print("In progressing")
         
-        for clause in current_clauses:
-            known = False
-            removedSymbols = []
             
-            for symbol in clause:
-                if symbol in model: 
-                    if model[symbol] == clause[symbol]:
-                        visited.append(clause)
-                        known = True
-                        break 
-                    else:
-                        removedSymbols.append(symbol)
-            for symbol in removedSymbols:
-                del clause[symbol]
-            
-            # If there is contradition so the problem is unsolvable.  
-            if known == False and not bool(clause):
+    def add_clause(self, clauses):
+        return self.add_literals(self.symbols.encode(clause) for clause in clauses)
+
+    def add_literals(self, clauses):
+        """Add clauses given as integer literals of self.symbols, without building dictionary clauses.
+        Like add_clause, the clauses after the first one already in the kb are not added.
+        :param clauses: iterable of clauses, each an iterable of integer literals
+        :returns: False if a clause was already in the kb, True otherwise
+        """
+        for literals in clauses:
+            literals = tuple(sorted(literals))
+            if literals in self.clauses:
                 return False
+            self.__insert(literals)
+            self.__extend_model(literals)
+            if self.__solver is not None:
+                self.__solver.reserve(len(self.symbols))
+                self.__solver.add_clause(literals)
+        return True
         
-        # just copy the elements from the base KB that not be deleted
-        temp_clauses = []
-        for clause in current_clauses:
-            if clause in visited:
-                continue
-            temp_clauses.append(clause)
-        current_clauses = temp_clauses
-
-        if len(current_clauses) == 0: #The case when all clauses are entailment by KB
-            return True
+    def del_clause(self, symbol, remove_all=False):
+        """Remove the first clause that mentions the symbol, or all of them with remove_all."""
+        var = self.symbols.lookup(symbol)
+        clauses = self.index.get(var)
+        if not clauses:
+            return False
+        for clause in list(clauses) if remove_all else [next(iter(clauses))]:
+            self.__remove(clause)
+            if self.__solver is not None and not self.__solver.remove_clause(clause):
+                self.__solver = None # the solver may have derived facts from the clause, rebuild it on the next solve
+        self.__refuted.clear()
+        return True
         
-        # Prunning    
-        puredSymbols, mark = self.extractPureSymbols(symbols, current_clauses)
-        if mark != None:
-            if(puredSymbols in symbols):
-                symbols.remove(puredSymbols)
-            model[puredSymbols] = mark
-            return self.dpll(current_clauses, model, symbols)
         
-        unit_clauses, mark = self.extractUnitClauses(current_clauses)
-        if mark != None:
-            if(unit_clauses in symbols):
-                symbols.remove(unit_clauses)
-            model[unit_clauses] = mark
-            return self.dpll(current_clauses, model, symbols)
-            
-        symbol, mark = self.selection(current_clauses, symbols)
-        if(symbol in symbols):
-            symbols.remove(symbol)
-        model[symbol]= mark
+    # Solving problem using DBLL, the unit clauses are handled by the propagation engine. The search is a loop over the
+    # trail of the solver: a failed branch is undone by backtracking the trail to the last decision that has not been
+    # flipped yet, and the opposite literal is tried in its place.
+    # The search runs above a root decision level, and the assumptions get a decision level each that is never flipped,
+    # so level 0 only ever holds the facts implied by the clauses.
+    def dpll(self, solver, assumptions=()):
+        solver.new_decision_level()
+        flipped = [True] # for each decision level, is its decision the second branch?
+        for literal in assumptions:
+            if solver.propagate() is not None or solver.value(literal) == -1:
+                return False
+            if solver.value(literal) == 0:
+                solver.decide(literal)
+                flipped.append(True)
 
-        if self.dpll(copy.deepcopy(current_clauses), copy.deepcopy(model), copy.deepcopy(symbols)):
-            return True
-        
-        model[symbol]= -mark
-        return self.dpll(current_clauses, model, symbols) 
+        while True:
+            conflict = solver.propagate()
+            if conflict is not None: # If there is contradition so the branch is unsolvable.
+                for literal in conflict:
+                    solver.heuristic.bump(abs(literal))
+                solver.heuristic.decay()
+                while flipped and flipped[-1]:
+                    flipped.pop()
+                if not flipped:
+                    return False
+                literal = solver.trail[solver.trail_lim[len(flipped) - 1]]
+                solver.backtrack(len(flipped) - 1)
+                solver.decide(-literal)
+                flipped[-1] = True
+                continue
+
+            if solver.unsatisfied == 0: #The case when all clauses are entailment by KB
+                return True
+
+            # Prunning: pure symbols are symbols that always be positive (or negative) in the unsatisfied clauses, they
+            # can be set to that sign without branching.
+            literal = solver.pure_literal()
+            if literal is not None:
+                solver.assign(literal, None)
+                continue
+
+            solver.decide(solver.heuristic.pick(solver))
+            flipped.append(False)
+
+    # Solving problem using CDCL. A conflict is analyzed to learn a clause that is implied by the kb, the search jumps
+    # back to the level where the learnt clause becomes unit instead of the last decision, and restarts from level 0
+    # after a number of conflicts given by the Luby sequence. The learnt clauses stay in the persistent solver, so they
+    # also cut the search of the following queries. The assumptions are decided first, one level each.
+    def cdcl(self, solver, assumptions=()):
+        conflicts = 0
+        restarts = 0
+        limit = 32 * luby(restarts)
+        while True:
+            conflict = solver.propagate()
+            if conflict is not None:
+                if solver.decision_level() == 0:
+                    solver.ok = False
+                    return False
+                learnt, level = solver.analyze(conflict)
+                solver.backtrack(level)
+                solver.learn(learnt)
+                conflicts += 1
+                continue
+
+            if conflicts >= limit:
+                solver.backtrack(0)
+                conflicts = 0
+                restarts += 1
+                limit = 32 * luby(restarts)
+                continue
+
+            level = solver.decision_level()
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = solver.value(literal)
+                if value == -1:
+                    return False
+                if value == 1:
+                    solver.new_decision_level()
+                else:
+                    solver.decide(literal)
+                continue
+
+            if solver.unsatisfied == 0:
+                return True
+            solver.decide(solver.heuristic.pick(solver))
+
+    def solver(self):
+        """The persistent solver of the kb, holding every clause and the facts they imply at level 0."""
+        if self.__solver is None:
+            self.__solver = Solver(len(self.symbols), HEURISTICS[self.heuristic](), pure_literals=True)
+            for clause in self.clauses:
+                self.__solver.add_clause(clause)
+        return self.__solver
+    
+    def __assume(self, assumptions):
+        literals = []
+        for clause in assumptions or []:
+            literals.extend(self.symbols.encode(clause))
+        solver = self.solver()
+        solver.reserve(len(self.symbols))
+        return solver, literals
+
+    def propagate(self, assumptions=None):
+        """Check if the kb is satisfiable by unit propagation and pure literals alone, without any search.
+        The assumptions are propagated first, and if everything they imply agrees with the last model found for the kb,
+        that model extends to the assumptions. Only otherwise are the pure literals set, which visits the whole kb.
+        :param assumptions: list of clauses assumed to hold, every literal in them is assumed to be True
+        :returns: True if the propagation satisfies every clause, False if it meets a conflict, None if it is
+        inconclusive
+        """
+        solver, literals = self.__assume(assumptions)
+        if not solver.ok:
+            return False
+        # The facts implied at level 0 are kept by the solver, so a query about one of them needs no propagation.
+        if any(solver.value(literal) == -1 for literal in literals):
+            return False
+        solver.new_decision_level()
+        try:
+            start = len(solver.trail)
+            for literal in literals:
+                if solver.value(literal) == 0:
+                    solver.assign(literal, None)
+            if solver.propagate() is not None:
+                return False
+            if solver.unsatisfied == 0:
+                return True
+            model = self.__model
+            if model is not None and all(abs(literal) >= len(model) or model[abs(literal)] != (-1 if literal > 0 else 1)
+                                         for literal in solver.trail[start:]):
+                return True
+            # Setting a pure literal keeps the clauses satisfiable, and it often leaves no unsatisfied clause at all.
+            while True:
+                literal = solver.pure_literal()
+                if literal is None:
+                    break
+                solver.assign(literal, None)
+                if solver.propagate() is not None:
+                    return False
+            if solver.unsatisfied == 0:
+                self.__model = list(solver.assigns)
+                return True
+            return None
+        finally:
+            solver.backtrack(0)
     
-    def solve(self):
+    def solve(self, assumptions=None):
+        """Check if the kb is satisfiable.
+        :param assumptions: list of clauses assumed to hold, every literal in them is assumed to be True
+        """
         if not self.clauses:
+            # An empty kb is not a problem to solve, but assumptions on it hold unless they contradict each other.
+            if not assumptions:
+                return False
+            literals = {literal for clause in assumptions for literal in self.symbols.encode(clause)}
+            return not any(-literal in literals for literal in literals)
+        solver, literals = self.__assume(assumptions)
+        if not solver.ok:
             return False
-        symbols = self.listSymbols(self.clauses)
-        return self.dpll(self.clauses, {}, symbols)
+        self.stats['solves'] += 1
+        search = self.cdcl if self.mode == 'cdcl' else self.dpll
+        try:
+            return search(solver, literals)
+        finally:
+            solver.backtrack(0)
+
+    def infer(self, clause):
+        """Check if the kb entails the negation of a unit clause, i.e. if the kb and the clause are unsatisfiable.
+        Unit propagation decides most of the queries, the solver only searches when it is inconclusive. Adding clauses
+        never makes an unsatisfiable query satisfiable again, so the refuted queries are kept until a clause is deleted.
+        """
+        assert len(clause) == 1, 'Query must be a unit clause'
+        literal = self.symbols.encode(clause)
+        if not self.clauses:
+            result = True # an empty kb entails nothing, and a unit query cannot contradict itself
+        elif literal in self.__refuted:
+            self.stats['propagations'] += 1
+            result = False
+        else:
+            result = self.propagate([clause])
+            if result is None:
+                result = self.solve([clause])
+            else:
+                self.stats['propagations'] += 1
+            if not result:
+                self.__refuted.add(literal)
+        return not result
 
 def test():
-    # case 1: Successfully
-    kb = KnowledgeBase(True, [{'S': 1, 'B': 0}, {'W': 1}, {'P': 1}, {'T': 1}, {'T':0, 'A': 0}])
-    result = kb.solve()
-    assert(result == True)
+    # Cases 1-5 and 9-11 run with every search mode and decision heuristic.
+    settings = [(mode, heuristic) for mode in ('dpll', 'cdcl') for heuristic in HEURISTICS]
+    for mode, heuristic in settings:
+        # case 1: Successfully
+        kb = KnowledgeBase(True, [{'S': 1, 'B': 0}, {'W': 1}, {'P': 1}, {'T': 1}, {'T':0, 'A': 0}], mode, heuristic)
+        result = kb.solve()
+        assert(result == True)
     
-    # case 2: There is contradition
-    kb = KnowledgeBase(True, [{'S': 1, 'B': 0}, {'W': 1}, {'P': 1}, {'T': 1}, {'T':0}])
-    result = kb.solve()
-    assert(result == False)
+        # case 2: There is contradition
+        kb = KnowledgeBase(True, [{'S': 1, 'B': 0}, {'W': 1}, {'P': 1}, {'T': 1}, {'T':0}], mode, heuristic)
+        result = kb.solve()
+        assert(result == False)
     
-    # case 3: taken from https://fanpu.io/blog/2021/a-dpll-sat-solver/
+        # case 3: taken from https://fanpu.io/blog/2021/a-dpll-sat-solver/
     
-    kb = KnowledgeBase(True, [{'x1': 0, 'x2': 0, 'x3':0}, {'x1': 1, 'x2': 1, 'x3':1}])
-    result = kb.solve()
-    assert(result == True)
+        kb = KnowledgeBase(True, [{'x1': 0, 'x2': 0, 'x3':0}, {'x1': 1, 'x2': 1, 'x3':1}], mode, heuristic)
+        result = kb.solve()
+        assert(result == True)
     
-    # case 4: Also in https://fanpu.io/blog/2021/a-dpll-sat-solver/
-    kb = KnowledgeBase(True, [{'x1': 1, 'x2': 0, 'x4':0}, {'x2': 1, 'x3': 0, 'x4':0}, {'x1': 0, 'x3': 1, 'x4':0}, {'x1': 0, 'x2': 1, 'x4':1}, {'x2': 0, 'x3': 1, 'x4':1}, {'x1': 1, 'x3': 0, 'x4':1},{'x1': 0, 'x2': 0, 'x3':0}, {'x1': 1, 'x2': 1, 'x3':1}])
-    result = kb.solve()
-    assert(result == False)
+        # case 4: Also in https://fanpu.io/blog/2021/a-dpll-sat-solver/
+        kb = KnowledgeBase(True, [{'x1': 1, 'x2': 0, 'x4':0}, {'x2': 1, 'x3': 0, 'x4':0}, {'x1': 0, 'x3': 1, 'x4':0}, {'x1': 0, 'x2': 1, 'x4':1}, {'x2': 0, 'x3': 1, 'x4':1}, {'x1': 1, 'x3': 0, 'x4':1},{'x1': 0, 'x2': 0, 'x3':0}, {'x1': 1, 'x2': 1, 'x3':1}], mode, heuristic)
+        result = kb.solve()
+        assert(result == False)
     
-    # case 5: Taken from https://www.cs.cornell.edu/courses/cs4860/2009sp/lec-04.pdf
-    kb = KnowledgeBase(True, [{'p': 0, 'q': 0, 'r': 0, 's': 0}, {'p': 1, 'q': 0, 'r': 1}, {'q': 1, 'r': 1, 's': 0}, {'p': 0, 'q': 1, 'r': 0, 's': 0}, {'q': 0, 'r': 1, 's': 1}, {'p': 1, 'r': 1, 's': 0}, {'p': 1, 's': 1}, {'p': 0, 'q': 1}])
-    result = kb.solve()
-    assert(result == True)
+        # case 5: Taken from https://www.cs.cornell.edu/courses/cs4860/2009sp/lec-04.pdf
+        kb = KnowledgeBase(True, [{'p': 0, 'q': 0, 'r': 0, 's': 0}, {'p': 1, 'q': 0, 'r': 1}, {'q': 1, 'r': 1, 's': 0}, {'p': 0, 'q': 1, 'r': 0, 's': 0}, {'q': 0, 'r': 1, 's': 1}, {'p': 1, 'r': 1, 's': 0}, {'p': 1, 's': 1}, {'p': 0, 'q': 1}], mode, heuristic)
+        result = kb.solve()
+        assert(result == True)
     
     # case 6: Test for del clause:
     kb = KnowledgeBase(True, [{'x1': 1, 'x2': 1, 'x3': 0}, {'x1': 1}, {'x4': 1, 'x3': 1, 'x1': 0}])
     
         # subtest: initially, the clause is existed in the kb
-    result = True if {'x4': 1, 'x3': 1, 'x1': 0} in kb.clauses else False
+    result = True if {'x4': 1, 'x3': 1, 'x1': 0} in kb else False
     assert(result == True)
 
     kb.del_clause('x4')
     
          # subtest: the clause is removed from the kb.
-    result = True if {'x4': 1, 'x3': 1, 'x1': 0} in kb.clauses else False
+    result = True if {'x4': 1, 'x3': 1, 'x1': 0} in kb else False
     assert(result == False)
         
     # case 7: Test for add clause:
     kb = KnowledgeBase(True, [{'x1': 1, 'x2': 1, 'x3': 0}, {'x1': 1}, {'x4': 1, 'x3': 1, 'x1': 0}])
     
         # subtest: initially, the clause is not existed in the kb
-    result = True if {'x1': 1, 'x2': 1, 'x3': 0, 'x4':1, 'x5': 0} in kb.clauses else False
+    result = True if {'x1': 1, 'x2': 1, 'x3': 0, 'x4':1, 'x5': 0} in kb else False
     assert(result == False)
 
     kb.add_clause([{'x1': 1, 'x2': 1, 'x3': 0, 'x4':1, 'x5': 0}])
     
          # subtest: the clause is added to the kb.
-    result = True if {'x1': 1, 'x2': 1, 'x3': 0, 'x4':1, 'x5': 0} in kb.clauses else False
+    result = True if {'x1': 1, 'x2': 1, 'x3': 0, 'x4':1, 'x5': 0} in kb else False
     assert(result == True)
     
         # subtest: the recently added clause is removed to the kb.
     kb.del_clause('x5')
-    result = True if {'x1': 1, 'x2': 1, 'x3': 0, 'x4':1, 'x5': 0} in kb.clauses else False
+    result = True if {'x1': 1, 'x2': 1, 'x3': 0, 'x4':1, 'x5': 0} in kb else False
     assert(result == False)
     
         # subtest: add existed clause:
     isSuccessful = kb.add_clause([{'x1': 1, 'x2': 1, 'x3': 0}])
     assert(isSuccessful == False)
     
-    print(kb.clauses)
+    print([kb.symbols.decode(clause) for clause in kb.clauses])
     
     
     
+        # subtest: remove every clause that mentions a symbol:
+    kb.add_clause([{'x1': 1, 'x5': 0}, {'x5': 1, 'x2': 0}])
+    assert(kb.del_clause('x5', remove_all=True) == True)
+    assert({'x1': 1, 'x5': 0} not in kb and {'x5': 1, 'x2': 0} not in kb)
+    assert(kb.del_clause('x5') == False)
+
+    # case 8: Solving does not modify the kb, so the same kb can be solved again.
+    kb = KnowledgeBase(True, [{'x1': 1, 'x2': 0, 'x4':0}, {'x2': 1, 'x3': 0, 'x4':0}, {'x1': 0, 'x3': 1, 'x4':0}, {'x1': 0, 'x2': 1, 'x4':1}, {'x2': 0, 'x3': 1, 'x4':1}, {'x1': 1, 'x3': 0, 'x4':1}])
+    clauses = list(kb.clauses)
+    assert(kb.solve() == True)
+    assert(list(kb.clauses) == clauses)
+    assert(kb.solve() == True)
+
+    for mode, heuristic in settings:
+        # case 9: Assumptions do not stay in the kb.
+        kb = KnowledgeBase(True, [{'x1': 0, 'x2': 0}, {'x2': 1, 'x3': 0}], mode, heuristic)
+        assert(kb.solve(assumptions=[{'x1': 1}, {'x3': 1}]) == False)
+        assert(kb.solve(assumptions=[{'x1': 1}]) == True)
+        kb.add_clause([{'x3': 1}])
+        assert(kb.solve(assumptions=[{'x1': 1}]) == False)
+        assert(kb.solve() == True)
+
+        # case 10: Inference, decided by the propagation or by the search.
+        kb = KnowledgeBase(True, [{'x1': 0, 'x2': 0}, {'x2': 1}, {'x3': 0, 'x4': 0, 'x5': 0}, {'x3': 0, 'x4': 1, 'x5': 0},
+                                  {'x3': 1, 'x4': 0, 'x5': 0}, {'x3': 1, 'x4': 1, 'x5': 0}], mode, heuristic)
+        assert(kb.infer({'x1': 1}) == True) # x1 is implied by propagation
+        assert(kb.infer({'x5': 1}) == True) # x5 needs a search
+        assert(kb.infer({'x5': 1}) == True) # the refuted query is known
+        assert(kb.infer({'x5': 0}) == False) # every clause is satisfied by propagation
+        assert(kb.stats == {'propagations': 3, 'solves': 1})
+
+        # case 11: Refuted queries are kept while clauses are added and dropped when one is deleted.
+        kb = KnowledgeBase(True, [{'x1': 0, 'x2': 0}], mode, heuristic)
+        assert(kb.infer({'x1': 1}) == False)
+        kb.add_clause([{'x2': 1}])
+        assert(kb.infer({'x1': 1}) == True)
+        kb.add_clause([{'x3': 1}])
+        assert(kb.infer({'x1': 1}) == True)
+        kb.del_clause('x2')
+        assert(kb.infer({'x1': 1}) == False)
+
     kb = KnowledgeBase(True, [])
     a = kb.solve()
     assert(a == False)
+
+    # case 12: An empty kb entails nothing, assumptions on it only fail when they contradict each other.
+    kb = KnowledgeBase(True, [])
+    assert(kb.solve(assumptions=[{'x1': 0}]) == True)
+    assert(kb.solve(assumptions=[{'x1': 0}, {'x2': 1}]) == True)
+    assert(kb.solve(assumptions=[{'x1': 0}, {'x1': 1}]) == False)
+
+    # case 13: Pigeonhole, 6 pigeons do not fit in 5 holes. Every search backtracks over several decision levels at
+    # once, and CDCL learns more clauses than the first restart allows, so it restarts before proving it.
+    pigeons = [{f'p{i}{j}': 0 for j in range(5)} for i in range(6)]
+    holes = [{f'p{i}{j}': 1, f'p{k}{j}': 1} for j in range(5) for i in range(6) for k in range(i + 1, 6)]
+    for mode, heuristic in settings:
+        kb = KnowledgeBase(True, pigeons + holes, mode, heuristic)
+        assert(kb.solve() == False)
+        if mode == 'cdcl':
+            assert(len(kb.solver().learnts) > 32 * luby(0))
+
+    # case 14: The model found by a query answers the next ones, and follows the clauses added to the kb.
+    kb = KnowledgeBase(True, [{'x1': 0, 'x2': 0}, {'x3': 0, 'x4': 0}])
+    assert(kb.infer({'x3': 1}) == False) # the pure literals find a model
+    assert(kb.infer({'x4': 0}) == False) # agrees with the model
+    kb.add_clause([{'x1': 1}, {'x2': 1, 'x5': 0}]) # the model may have to set x2 and x5
+    assert(kb.infer({'x2': 1}) == True)
+    assert(kb.infer({'x5': 1}) == True)
+    assert(kb.infer({'x4': 1}) == False)
+
+    # case 15: A fact learnt from a deleted clause does not stay in the solver.
+    for mode, heuristic in settings:
+        kb = KnowledgeBase(True, [{'x1': 0, 'x2': 0}, {'x1': 0, 'x2': 1}], mode, heuristic)
+        assert(kb.solve() == True)
+        kb.del_clause('x2')
+        assert(kb.solve(assumptions=[{'x1': 1}]) == True)
+
+    # case 16: Clauses given as integer literals are the same as the dictionary clauses.
+    kb = KnowledgeBase(True, [{'x1': 0, 'x2': 1}])
+    x1, x2 = kb.symbols.intern('x1'), kb.symbols.intern('x2')
+    assert(kb.add_literals([[-x2, x1]]) == False) # already in the kb
+    assert(kb.add_literals([[x2], [x1]]) == True)
+    assert({'x1': 0} in kb and {'x2': 0} in kb)
+    assert(kb.infer({'x1': 1}) == True and kb.infer({'x3': 1}) == False)
     
     print(a)
     
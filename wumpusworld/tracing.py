@@ -0,0 +1,69 @@
+# Trace output of the game and the agent. Nothing is written unless a level is configured, either by calling
+# configure() or through the environment:
+#   WUMPUS_TRACE=debug|info|warning     the lowest level that is written
+#   WUMPUS_TRACE_FILE=path              write the events as JSON lines to this file instead of the console
+import json
+import os
+import sys
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'off': OFF}
+NAMES = {value: key for key, value in LEVELS.items()}
+
+level = OFF
+sink = None
+
+
+def configure(threshold=INFO, path=None):
+    """Set the lowest level that is written and where the events go.
+    :param threshold: one of DEBUG, INFO, WARNING or OFF, or its name
+    :param path: a file to append the events to as JSON lines, None to write them to the console
+    """
+    global level, sink
+    if isinstance(threshold, str):
+        assert threshold.lower() in LEVELS, 'Invalid trace level'
+        threshold = LEVELS[threshold.lower()]
+    if sink is not None:
+        sink.close()
+    level = threshold
+    sink = open(path, 'a') if path is not None else None
+
+
+def enabled(threshold):
+    """Check if events of a level are written, to skip building expensive fields."""
+    return threshold >= level
+
+
+def encode(value):
+    """Convert the keys of the dictionaries in a value to strings, JSON objects only have string keys."""
+    if isinstance(value, dict):
+        return {key if isinstance(key, str) else str(key): encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    return value
+
+
+def emit(threshold, event, **fields):
+    """Write an event if its level is enabled.
+    :param threshold: level of the event
+    :param event: name of the event
+    :param fields: data of the event, must be convertible to JSON (other values and keys are written with str)
+    """
+    if threshold < level:
+        return
+    if sink is None:
+        print(event, *(f'{key}={value}' for key, value in fields.items()), file=sys.stderr)
+        return
+    record = {'time': time.time(), 'level': NAMES.get(threshold, threshold), 'event': event}
+    record.update(encode(fields))
+    sink.write(json.dumps(record, default=str) + '\n')
+    sink.flush()
+
+
+if os.environ.get('WUMPUS_TRACE'):
+    configure(os.environ['WUMPUS_TRACE'], os.environ.get('WUMPUS_TRACE_FILE'))
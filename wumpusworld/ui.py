@@ -12,6 +12,7 @@
 # system from (x, y) to (i, j) and vice versa.
 import pygame
 import re
+import tracing
 
 pygame.init()
 
@@ -126,7 +127,7 @@ class Spot:
                 elif 'OR' in self.name:
                     win.blit(self.sprite__arrow_right, (self.x + grid_start_x, self.y + grid_start_y))
                     direction = 'R'
-                print(self.name)
+                tracing.emit(tracing.DEBUG, 'arrow', name=self.name)
                 self.name = self.name.replace(f'O{direction}', '', 1)
                 self.shoot = True
 
@@ -275,24 +276,23 @@ class Sprite:
                 self.visual_grid[shoot_coord[0]][shoot_coord[1]].name += 'OR'
 
             if 'W' in self.visual_grid[shoot_coord[0]][shoot_coord[1]].name:
-                print("Shoot coord")
-                print(shoot_coord)
+                tracing.emit(tracing.DEBUG, 'shoot', coord=shoot_coord)
                 if shoot_coord[0] + 1 < self.rows:
                     self.visual_grid[shoot_coord[0] + 1][shoot_coord[1]].name \
                         = self.visual_grid[shoot_coord[0] + 1][shoot_coord[1]].name.replace('S', '', 1)
-                    print(self.visual_grid[shoot_coord[0] + 1][shoot_coord[1]].name)
+                    tracing.emit(tracing.DEBUG, 'stench', name=self.visual_grid[shoot_coord[0] + 1][shoot_coord[1]].name)
                 if shoot_coord[0] - 1 >= 0:
                     self.visual_grid[shoot_coord[0] - 1][shoot_coord[1]].name \
                         = self.visual_grid[shoot_coord[0] - 1][shoot_coord[1]].name.replace('S', '', 1)
-                    print(self.visual_grid[shoot_coord[0] - 1][shoot_coord[1]].name)
+                    tracing.emit(tracing.DEBUG, 'stench', name=self.visual_grid[shoot_coord[0] - 1][shoot_coord[1]].name)
                 if shoot_coord[1] + 1 < self.columns:
                     self.visual_grid[shoot_coord[0]][shoot_coord[1] + 1].name \
                         = self.visual_grid[shoot_coord[0]][shoot_coord[1] + 1].name.replace('S', '', 1)
-                    print(self.visual_grid[shoot_coord[0]][shoot_coord[1] + 1].name)
+                    tracing.emit(tracing.DEBUG, 'stench', name=self.visual_grid[shoot_coord[0]][shoot_coord[1] + 1].name)
                 if shoot_coord[1] - 1 >= 0:
                     self.visual_grid[shoot_coord[0]][shoot_coord[1] - 1].name \
                         = self.visual_grid[shoot_coord[0]][shoot_coord[1] - 1].name.replace('S', '', 1)
-                    print(self.visual_grid[shoot_coord[0]][shoot_coord[1] - 1].name)
+                    tracing.emit(tracing.DEBUG, 'stench', name=self.visual_grid[shoot_coord[0]][shoot_coord[1] - 1].name)
 
                 # self.visual_grid[self.x // self.gap + corX][self.y // self.gap + corY].name.replace('W', '')
 
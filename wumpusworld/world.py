@@ -1,4 +1,5 @@
 from enum import Enum
+import tracing
 
 
 class Direction(Enum):
@@ -8,6 +9,33 @@ class Direction(Enum):
     UP = 4
 
 
+class Percept:
+    """Bit flags of the content and the percepts of a room, a room is stored as the bitwise or of its flags."""
+    PIT = 1
+    WUMPUS = 2
+    GOLD = 4
+    BREEZE = 8
+    STENCH = 16
+    KILLED = 32 # a wumpus that has been shot
+    EMPTY = 64 # a gold that has been picked up
+
+    LETTERS = (('P', PIT), ('W', WUMPUS), ('G', GOLD), ('B', BREEZE), ('S', STENCH), ('K', KILLED), ('E', EMPTY))
+
+    @classmethod
+    def parse(cls, text: str):
+        """Convert a string representation of percepts (e.g. 'PB') into flags, unknown letters are ignored."""
+        flags = 0
+        for letter, flag in cls.LETTERS:
+            if letter in text:
+                flags |= flag
+        return flags
+
+    @classmethod
+    def to_string(cls, flags: int):
+        """Convert flags into a string representation of percepts."""
+        return ''.join(letter for letter, flag in cls.LETTERS if flags & flag)
+
+
 class WumpusWorld:
     def __init__(self, path: str):
         """Initialize the world.
@@ -16,158 +44,111 @@ class WumpusWorld:
         self.n, self.__world, self.agent, self.stenches = self.read_map(path)
 
     @classmethod
-    def __set_adjecent_rooms(cls, world, n: int, i: int, j: int, stenches: dict):
-        """Set percepts of adjacent rooms.
-        :param world: the world
+    def __spread(cls, mask: bytes, n: int):
+        """Count for every room how many of its adjacent rooms are marked.
+        The rooms are packed one per byte into a big integer so the four shifts and additions run over the whole world
+        at once, a count never exceeds 4 so it never carries into the next room.
+        :param mask: a flat array of 0 or 1 per room, row by row from the top row of the map
         :param n: size of the world
-        :param i: row index of the room
-        :param j: column index of the room
-        :param stenches: a dictionary data structure to keep track of stenches
+        :returns: a flat array of the counts
         """
-        signal = ''
-        if 'W' in world[i][j]:
-            signal = 'S'
-        elif 'P' in world[i][j]:
-            print(world[i][j])
-            signal = 'B'
-        assert signal != '', 'Invalid percept'
-        if i > 0:
-            x, y = n - i + 1, j + 1
-            if signal == 'S':
-                if (x, y) not in stenches:
-                    world[i - 1][j] += signal
-                    stenches.update({(x, y): 1})
-                else:
-                    stenches[(x, y)] += 1
-            else:
-                if signal not in world[i - 1][j]:
-                    world[i - 1][j] += signal
-        if i < n - 1:
-            if signal == 'S':
-                x, y = n - i - 1, j + 1
-                if (x, y) not in stenches:
-                    world[i + 1][j] += signal
-                    stenches.update({(x, y): 1})
-                else:
-                    stenches[(x, y)] += 1
-            else:
-                if signal not in world[i + 1][j]:
-                    world[i + 1][j] += signal
-        if j > 0:
-            if signal == 'S':
-                x, y = n - i, j
-                if (x, y) not in stenches:
-                    world[i][j - 1] += signal
-                    stenches.update({(x, y): 1})
-                else:
-                    stenches[(x, y)] += 1
-            else:
-                if signal not in world[i][j - 1]:
-                    world[i][j - 1] += signal
-        if j < n - 1:
-            if signal == 'S':
-                x, y = n - i, j + 2
-                if (x, y) not in stenches:
-                    world[i][j + 1] += signal
-                    stenches.update({(x, y): 1})
-                else:
-                    stenches[(x, y)] += 1
-            else:
-                if signal not in world[i][j + 1]:
-                    world[i][j + 1] += signal
+        size = n * n
+        rooms = int.from_bytes(mask, 'big')
+        full = (1 << 8 * size) - 1
+        not_first = int.from_bytes((b'\x00' + b'\x01' * (n - 1)) * n, 'big')
+        not_last = int.from_bytes((b'\x01' * (n - 1) + b'\x00') * n, 'big')
+        counts = ((rooms & not_last) >> 8) + ((rooms & not_first) << 8) + (rooms >> 8 * n) + ((rooms << 8 * n) & full)
+        return counts.to_bytes(size, 'big')
 
     @classmethod
     def read_map(cls, path: str):
         """Read the map from file. Should be only called by the constructor.
         :param path: path to the map file
-        :returns: a tuple of (n, world, agent, stenches)
+        :returns: a tuple of (n, world, agent, stenches), the world is a flat array of percept flags, row by row from
+        the top row of the map, and stenches counts the living wumpuses adjacent to each room in the same layout
         """
         with open(path, 'r') as f:
             n = int(f.readline())
-            world = [[room.replace('-', '') for room in f.readline().strip().replace(' ', '').split('.')] for _ in
-                     range(n)]
-        agent = None
-        stenches = {}
-        for i in range(n):
-            for j in range(n):
-                if 'P' in world[i][j]:
-                    cls.__set_adjecent_rooms(world, n, i, j, stenches)
-                elif 'W' in world[i][j]:
-                    cls.__set_adjecent_rooms(world, n, i, j, stenches)
-                elif 'A' in world[i][j]:
-                    agent = n - i, j + 1
-                    world[i][j] = world[i][j].replace('A', '')
-        return n, world, agent, stenches
+            rooms = '.'.join(f.readline().strip().replace(' ', '') for _ in range(n)).split('.')
+        assert len(rooms) == n * n, 'Invalid map'
+        flags, agents = {}, {}
+        for room in set(rooms):
+            flags[room] = Percept.parse(room)
+            agents[room] = 'A' in room and not flags[room] & (Percept.PIT | Percept.WUMPUS)
+        world = bytes(map(flags.__getitem__, rooms))
+        agent = bytes(map(agents.__getitem__, rooms)).rfind(1)
+        agent = (n - agent // n, agent % n + 1) if agent >= 0 else None
+        # a room with both a pit and a wumpus only smells
+        pits = world.translate(bytes(v & Percept.PIT and not v & Percept.WUMPUS for v in range(256)))
+        wumpuses = world.translate(bytes(v & Percept.WUMPUS and 1 for v in range(256)))
+        breezes = cls.__spread(pits, n).translate(bytes(v and Percept.BREEZE for v in range(256)))
+        counts = cls.__spread(wumpuses, n)
+        smells = counts.translate(bytes(v and Percept.STENCH for v in range(256)))
+        world = bytearray((int.from_bytes(world, 'big') | int.from_bytes(breezes, 'big') |
+                           int.from_bytes(smells, 'big')).to_bytes(n * n, 'big'))
+        return n, world, agent, bytearray(counts)
 
     def row(self, item):
         """Get a row of the world.
         :param item: index of the row
-        :returns: an array of rooms
+        :returns: an array of percept flags of the rooms
         """
-        return self.__world[self.n - item]
+        return list(self.__world[(self.n - item) * self.n:(self.n - item + 1) * self.n])
 
     def col(self, item):
         """Get a column of the world.
         :param item: index of the column
-        :returns: an array of rooms
+        :returns: an array of percept flags of the rooms
         """
-        return [self.__world[self.n - i][item - 1] for i in range(1, self.n + 1)]
+        return [self.__world[(self.n - i) * self.n + item - 1] for i in range(1, self.n + 1)]
 
     def __getitem__(self, item):
-        print (item)
         """Get a room at position (x, y).
         :param item: position of the room
-        :returns: a string representation of all percepts in the room
+        :returns: the percept flags of the room
         :raises AssertionError: if item is not a tuple of length 2
         """
         assert isinstance(item, tuple) and len(item) == 2, 'Index must be a tuple of length 2'
-        return self.__world[self.n - item[0]][item[1] - 1]
+        tracing.emit(tracing.DEBUG, 'room', position=item)
+        return self.__world[(self.n - item[0]) * self.n + item[1] - 1]
 
     def __setitem__(self, key, value):
         """Set a room at position (x, y).
         :param key: position of the room
-        :param value: a string representation of all percepts in the room
+        :param value: the percept flags of the room
         :raises AssertionError: if key is not a tuple of length 2
         """
         assert isinstance(key, tuple) and len(key) == 2, 'Index must be a tuple of length 2'
-        self.__world[self.n - key[0]][key[1] - 1] = value
+        self.__world[(self.n - key[0]) * self.n + key[1] - 1] = value
 
     def __str__(self):
-        return f'N = {self.n}\n' + str(self.__world)
+        return f'N = {self.n}\n' + str(self.get_world())
 
     def get_world(self):
-        return self.__world
+        """Get the world as rows of string representations of the percepts, from the top row of the map."""
+        return [[Percept.to_string(room) for room in self.__world[i * self.n:(i + 1) * self.n]] for i in range(self.n)]
+
     def pickup_gold(self, position):
-        if 'G' not in self[position]:
+        if not self[position] & Percept.GOLD:
             return False
-        self[position] = self[position].replace('G', 'E')
+        self[position] = self[position] & ~Percept.GOLD | Percept.EMPTY
         return True
 
     def kill_wumpus(self, position):
-        if 'W' not in self[position]:
-            return False
-        self[position] = self[position].replace('W', 'K')
+        """Kill the wumpus in a room, an adjacent room stops smelling once no living wumpus is next to it.
+        :param position: position of the room
+        :returns: True if there was a wumpus in the room, False otherwise
+        """
         x, y = position
-        if x > 1 and (x - 1, y) in self.stenches:
-            self.stenches[(x - 1, y)] -= 1
-            if self.stenches[(x - 1, y)] == 0:
-                self.stenches.pop((x - 1, y))
-                self[(x - 1, y)] = self[(x - 1, y)].replace('S', '')
-        if x < self.n and (x + 1, y) in self.stenches:
-            self.stenches[(x + 1, y)] -= 1
-            if self.stenches[(x + 1, y)] == 0:
-                self.stenches.pop((x + 1, y))
-                self[(x + 1, y)] = self[(x + 1, y)].replace('S', '')
-        if y > 1 and (x, y - 1) in self.stenches:
-            self.stenches[(x, y - 1)] -= 1
-            if self.stenches[(x, y - 1)] == 0:
-                self.stenches.pop((x, y - 1))
-                self[(x, y - 1)] = self[(x, y - 1)].replace('S', '')
-        if y < self.n and (x, y + 1) in self.stenches:
-            self.stenches[(x, y + 1)] -= 1
-            if self.stenches[(x, y + 1)] == 0:
-                self.stenches.pop((x, y + 1))
-                self[(x, y + 1)] = self[(x, y + 1)].replace('S', '')
+        i = (self.n - x) * self.n + y - 1
+        if not self.__world[i] & Percept.WUMPUS:
+            return False
+        self.__world[i] = self.__world[i] & ~Percept.WUMPUS | Percept.KILLED
+        for adjacent, valid in ((i + self.n, x > 1), (i - self.n, x < self.n), (i - 1, y > 1), (i + 1, y < self.n)):
+            if valid:
+                self.stenches[adjacent] -= 1
+                if self.stenches[adjacent] == 0:
+                    self.__world[adjacent] &= ~Percept.STENCH
         return True
 
     def get_adjacents(self, position):